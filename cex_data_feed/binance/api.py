@@ -4,14 +4,33 @@ from dataclasses import dataclass
 from datetime import datetime, timezone
 from typing import List, Tuple
 from urllib.parse import urlencode
-from urllib.request import Request, urlopen
-import json
 
+import numpy as np
 import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+
+try:  # orjson parses the raw response bytes several times faster than stdlib json
+    from orjson import loads as _json_loads  # type: ignore
+except ImportError:  # pragma: no cover - optional dependency
+    from json import loads as _json_loads
 
 
 BINANCE_FAPI = "https://fapi.binance.com"
 
+# Shared keep-alive session: repeated fetches (backfill loops) reuse pooled TCP/TLS connections
+_session = requests.Session()
+_session.headers.update({"User-Agent": "ohlcv-feed/1.0"})
+_adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8)
+_session.mount("https://", _adapter)
+_session.mount("http://", _adapter)
+
+
+def _get_json(url: str):
+    resp = _session.get(url, timeout=15)
+    resp.raise_for_status()
+    return _json_loads(resp.content)
+
 
 @dataclass(frozen=True)
 class Kline:
@@ -39,9 +58,7 @@ def fetch_klines(symbol: str, interval: str, limit: int) -> List[Kline]:
     Returns a list of Kline with string price/volume fields as returned by the API.
     """
     url = _build_klines_url(symbol, interval, limit)
-    req = Request(url, headers={"User-Agent": "ohlcv-feed/1.0"})
-    with urlopen(req, timeout=15) as resp:
-        payload = json.loads(resp.read())
+    payload = _get_json(url)
     klines: List[Kline] = []
     for row in payload:
         # Row format per Binance docs
@@ -65,64 +82,102 @@ def fetch_klines(symbol: str, interval: str, limit: int) -> List[Kline]:
     return klines
 
 
+# Column order of a raw kline row (see fetch_klines); ignore (index 11) is never read
+KLINE_ARRAY_FIELDS = (
+    "open_time_ms",
+    "open",
+    "high",
+    "low",
+    "close",
+    "volume",
+    "close_time_ms",
+    "quote_asset_volume",
+    "num_trades",
+    "taker_buy_base_volume",
+    "taker_buy_quote_volume",
+)
+_KLINE_INT_FIELDS = {"open_time_ms", "close_time_ms", "num_trades"}
+
+
+def _kline_rows_to_arrays(rows) -> dict[str, np.ndarray]:
+    """Column-slice raw kline rows (API row order) into typed numpy arrays."""
+    n = len(KLINE_ARRAY_FIELDS)
+    arr = np.array(rows, dtype=object) if len(rows) else np.empty((0, n), dtype=object)
+    return {
+        name: arr[:, i].astype(np.int64 if name in _KLINE_INT_FIELDS else np.float64)
+        for i, name in enumerate(KLINE_ARRAY_FIELDS)
+    }
+
+
+def fetch_klines_as_arrays(symbol: str, interval: str, limit: int) -> dict[str, np.ndarray]:
+    """Fetch recent klines straight into per-field numpy arrays (see KLINE_ARRAY_FIELDS).
+
+    Skips the per-row Kline objects that fetch_klines builds.
+    """
+    return _kline_rows_to_arrays(_get_json(_build_klines_url(symbol, interval, limit)))
+
+
+def klines_to_arrays(klines: List[Kline]) -> dict[str, np.ndarray]:
+    """Same arrays as fetch_klines_as_arrays, from already-built Kline objects."""
+    return _kline_rows_to_arrays(
+        [
+            (
+                k.open_time_ms,
+                k.open,
+                k.high,
+                k.low,
+                k.close,
+                k.volume,
+                k.close_time_ms,
+                k.quote_asset_volume,
+                k.num_trades,
+                k.taker_buy_base_volume,
+                k.taker_buy_quote_volume,
+            )
+            for k in klines
+        ]
+    )
+
+
+def kline_arrays_to_dataframe(arrays: dict[str, np.ndarray]) -> pd.DataFrame:
+    """Build the canonical kline DataFrame (see klines_to_dataframe) from per-field arrays.
+
+    Also keeps _open_time_ms (raw Binance open time, int64 epoch ms) for the hourly CLI's append.
+    """
+    open_ms = arrays["open_time_ms"]
+    df = pd.DataFrame(
+        {
+            "timestamp": pd.to_datetime(open_ms, unit="ms"),
+            "open": arrays["open"],
+            "high": arrays["high"],
+            "low": arrays["low"],
+            "close": arrays["close"],
+            "volume": arrays["volume"],
+            "quote_asset_volume": arrays["quote_asset_volume"],
+            "num_trades": arrays["num_trades"],
+            "taker_buy_base_volume": arrays["taker_buy_base_volume"],
+            "taker_buy_quote_volume": arrays["taker_buy_quote_volume"],
+            "_close_time": pd.to_datetime(arrays["close_time_ms"], unit="ms"),
+            "_open_time_ms": open_ms,
+        }
+    )
+    # Binance returns klines ascending; only sort when that does not hold
+    if not df["timestamp"].is_monotonic_increasing:
+        df = df.sort_values("timestamp", kind="mergesort").reset_index(drop=True)
+    return df
+
+
 def klines_to_dataframe(klines: List[Kline]) -> pd.DataFrame:
     """Map raw klines into canonical DataFrame.
 
     Columns: timestamp, open, high, low, close, volume, quote_asset_volume,
              num_trades, taker_buy_base_volume, taker_buy_quote_volume, _close_time
 
-    - timestamp: pandas datetime64[ns] (UTC, naive by convention)
+    - timestamp: pandas datetime64 (UTC, naive by convention)
     - numerical columns: float64 (num_trades: int)
     - sorted ascending by timestamp
     """
-    if not klines:
-        return pd.DataFrame(
-            columns=[
-                "timestamp",
-                "open",
-                "high",
-                "low",
-                "close",
-                "volume",
-                "quote_asset_volume",
-                "num_trades",
-                "taker_buy_base_volume",
-                "taker_buy_quote_volume",
-            ]
-        ).astype(
-            {
-                "timestamp": "datetime64[ns]",
-                "open": float,
-                "high": float,
-                "low": float,
-                "close": float,
-                "volume": float,
-                "quote_asset_volume": float,
-                "num_trades": int,
-                "taker_buy_base_volume": float,
-                "taker_buy_quote_volume": float,
-            }
-        )
-    df = pd.DataFrame(
-        [
-            {
-                "timestamp": pd.to_datetime(k.open_time_ms, unit="ms", utc=True).tz_convert(None),
-                "open": float(k.open),
-                "high": float(k.high),
-                "low": float(k.low),
-                "close": float(k.close),
-                "volume": float(k.volume),
-                "quote_asset_volume": float(k.quote_asset_volume) if k.quote_asset_volume is not None else None,
-                "num_trades": k.num_trades,
-                "taker_buy_base_volume": float(k.taker_buy_base_volume) if k.taker_buy_base_volume is not None else None,
-                "taker_buy_quote_volume": float(k.taker_buy_quote_volume) if k.taker_buy_quote_volume is not None else None,
-                "_close_time": pd.to_datetime(k.close_time_ms, unit="ms", utc=True).tz_convert(None),
-            }
-            for k in klines
-        ]
-    )
-    df = df.sort_values("timestamp", kind="mergesort").reset_index(drop=True)
-    return df
+    return kline_arrays_to_dataframe(klines_to_arrays(klines)).drop(columns="_open_time_ms")
 
 
 def compute_target_hour(now: datetime | None = None) -> Tuple[pd.Timestamp, pd.Timestamp]:
@@ -131,7 +186,10 @@ def compute_target_hour(now: datetime | None = None) -> Tuple[pd.Timestamp, pd.T
     Returns (now_floor, target_hour) as pandas Timestamps (UTC-naive by convention).
     """
     now = now or datetime.now(timezone.utc)
-    now_floor = pd.Timestamp(now).floor("h").tz_convert(None)
+    if now.tzinfo is not None:
+        now = now.astimezone(timezone.utc)
+    # Stdlib floor; only the final value becomes a pandas Timestamp
+    now_floor = pd.Timestamp(now.replace(minute=0, second=0, microsecond=0, tzinfo=None))
     target_hour = now_floor - pd.Timedelta(hours=1)
     return now_floor, target_hour
 
@@ -154,9 +212,7 @@ def fetch_open_interest(symbol: str) -> OpenInterest:
     """Fetch current open interest from Binance Futures API."""
     qs = urlencode({"symbol": symbol})
     url = f"{BINANCE_FAPI}/fapi/v1/openInterest?{qs}"
-    req = Request(url, headers={"User-Agent": "ohlcv-feed/1.0"})
-    with urlopen(req, timeout=15) as resp:
-        data = json.loads(resp.read())
+    data = _get_json(url)
     return OpenInterest(
         symbol=data["symbol"],
         open_interest=float(data["openInterest"]),
@@ -182,9 +238,7 @@ def fetch_open_interest_hist(
     """
     qs = urlencode({"symbol": symbol, "period": period, "limit": limit})
     url = f"{BINANCE_FAPI}/futures/data/openInterestHist?{qs}"
-    req = Request(url, headers={"User-Agent": "ohlcv-feed/1.0"})
-    with urlopen(req, timeout=15) as resp:
-        payload = json.loads(resp.read())
+    payload = _get_json(url)
     result: List[OpenInterestHist] = []
     for row in payload:
         result.append(
@@ -248,9 +302,7 @@ def fetch_long_short_ratio(
     """
     qs = urlencode({"symbol": symbol, "period": period, "limit": limit})
     url = f"{BINANCE_FAPI}/futures/data/globalLongShortAccountRatio?{qs}"
-    req = Request(url, headers={"User-Agent": "ohlcv-feed/1.0"})
-    with urlopen(req, timeout=15) as resp:
-        payload = json.loads(resp.read())
+    payload = _get_json(url)
     result: List[LongShortRatio] = []
     for row in payload:
         result.append(
@@ -305,9 +357,7 @@ def fetch_premium_index_klines(symbol: str, interval: str, limit: int) -> List[K
     """
     qs = urlencode({"symbol": symbol, "interval": interval, "limit": limit})
     url = f"{BINANCE_FAPI}/fapi/v1/premiumIndexKlines?{qs}"
-    req = Request(url, headers={"User-Agent": "ohlcv-feed/1.0"})
-    with urlopen(req, timeout=15) as resp:
-        payload = json.loads(resp.read())
+    payload = _get_json(url)
     klines: List[Kline] = []
     for row in payload:
         klines.append(
@@ -349,9 +399,7 @@ def fetch_spot_klines(symbol: str, interval: str, limit: int) -> List[SpotKline]
     """
     qs = urlencode({"symbol": symbol, "interval": interval, "limit": limit})
     url = f"{BINANCE_SPOT_API}/api/v3/klines?{qs}"
-    req = Request(url, headers={"User-Agent": "ohlcv-feed/1.0"})
-    with urlopen(req, timeout=15) as resp:
-        payload = json.loads(resp.read())
+    payload = _get_json(url)
     klines: List[SpotKline] = []
     for row in payload:
         klines.append(
@@ -6,21 +6,28 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Optional
 
+import duckdb  # type: ignore
+import numpy as np
 import pandas as pd
 
-from .api import fetch_klines, klines_to_dataframe, compute_target_hour
+from .api import fetch_klines_as_arrays, kline_arrays_to_dataframe, compute_target_hour
 from .db import (
+    connect,
     ensure_table,
     read_last_n_rows_ending_before,
-    append_row_if_absent,
-    coverage_stats,
+    append_values_if_absent,
+    append_rows_if_absent,
+    read_overlap_bundle,
+    window_diff_stats,
 )
-from .persistence import PersistConfig, now_utc_run_id, write_raw_snapshot
-from .validation import validate_window
+from .persistence import PersistConfig, now_utc_run_id, write_raw_snapshot, write_raw_snapshot_parquet
+from .validation import ValidationResult, precheck_window, validate_diff_stats, validate_window
 
 
 DEFAULT_SYMBOL = "BTCUSDT"
 DEFAULT_INTERVAL = "1h"
+_ONE_MS = np.timedelta64(1, "ms")
+_ONE_HOUR = np.timedelta64(1, "h")
 
 
 @dataclass
@@ -32,24 +39,50 @@ class RunConfig:
     dry_run: bool = False
     debug: bool = False
     catch_up: bool = False
+    snapshot_format: str = "csv"
+
+
+def validate_window_in_db(
+    api_df: pd.DataFrame,
+    db_path: Path,
+    target_hour: pd.Timestamp,
+    tolerance: float = 1e-8,
+    con: Optional[duckdb.DuckDBPyConnection] = None,
+) -> ValidationResult:
+    """Same checks as validate_window, with the DB comparison computed in DuckDB.
+
+    Only per-column max diffs come back, instead of the N-1 DB rows.
+    """
+    early = precheck_window(api_df, target_hour)
+    if early is not None:
+        return early
+    api_hist = api_df.iloc[:-1]
+    db_rows, matched, max_diff = window_diff_stats(db_path, api_hist, target_hour, con=con)
+    return validate_diff_stats(db_rows, matched, max_diff, len(api_hist), tolerance)
 
 
 def run_once(cfg: RunConfig) -> int:
-    # Ensure DB table exists
-    ensure_table(cfg.duckdb_path)
+    # One DuckDB connection for the whole cycle
+    with connect(cfg.duckdb_path) as con:
+        # Ensure DB table exists
+        ensure_table(cfg.duckdb_path, con=con)
+        return _run_cycle(cfg, con)
 
+
+def _run_cycle(cfg: RunConfig, con: duckdb.DuckDBPyConnection) -> int:
     # Compute times
     now_floor, target_hour = compute_target_hour()
 
     # Pull recent klines
-    klines = fetch_klines(DEFAULT_SYMBOL, DEFAULT_INTERVAL, cfg.n_recent)
-    api_df = klines_to_dataframe(klines)
+    api_df = kline_arrays_to_dataframe(fetch_klines_as_arrays(DEFAULT_SYMBOL, DEFAULT_INTERVAL, cfg.n_recent))
+    # snapshot_time = close time (open + 1h for 1h candles)
+    api_df["snapshot_time"] = api_df["timestamp"] + _ONE_HOUR
 
     # Use only closed candles: close_time strictly before now_floor
     if "_close_time" not in api_df.columns:
         print("[ERROR] Missing _close_time column in API DataFrame", file=sys.stderr)
         return 2
-    closed_df = api_df[api_df["_close_time"] <= now_floor - pd.Timedelta(milliseconds=1)].copy()
+    closed_df = api_df[api_df["_close_time"].to_numpy() <= now_floor.to_datetime64() - _ONE_MS]
     if closed_df.empty:
         print("[ERROR] No closed candles in API response window", file=sys.stderr)
         return 2
@@ -64,19 +97,23 @@ def run_once(cfg: RunConfig) -> int:
     # Persist raw snapshot regardless of validation result
     run_id = now_utc_run_id()
     persist_cfg = PersistConfig(cfg.persist_dir, cfg.dataset_slug)
-    raw_path = write_raw_snapshot(persist_cfg, run_id, api_df)
+    if cfg.snapshot_format == "parquet":
+        raw_path = write_raw_snapshot_parquet(persist_cfg, run_id, api_df)
+    else:
+        raw_path = write_raw_snapshot(persist_cfg, run_id, api_df)
 
     appended = 0
     if cfg.catch_up:
         # Catch-up mode: validate overlap and append all missing closed rows
-        cov = coverage_stats(cfg.duckdb_path)
-        if cov is None:
+        # DB tail aggregate and validation history in one round-trip (sized for the largest window)
+        k_max = max(cfg.n_recent - 1, 1)
+        db_max_ts, db_tail = read_overlap_bundle(cfg.duckdb_path, k_max - 1, con=con)
+        if db_max_ts is None:
             # Bootstrap: DB empty, append entire closed window
-            to_append = closed_df.copy()
+            to_append = closed_df
         else:
-            _, db_max_ts, _ = cov
             # Build overlap against DB tail up to db_max_ts
-            api_overlap = closed_df[closed_df["timestamp"] <= db_max_ts].copy()
+            api_overlap = closed_df[closed_df["timestamp"] <= db_max_ts]
             if api_overlap.empty:
                 print(
                     "[ERROR] No overlap between API closed window and DB. Increase --n-recent or backfill first.",
@@ -85,48 +122,50 @@ def run_once(cfg: RunConfig) -> int:
                 return 2
             # Validate overlap anchored at last overlap timestamp
             t_overlap = api_overlap.iloc[-1]["timestamp"]
-            k = min(len(api_overlap), max(cfg.n_recent - 1, 1))
+            k = min(len(api_overlap), k_max)
             api_tail_for_val = api_overlap.tail(k).reset_index(drop=True)
-            db_hist = read_last_n_rows_ending_before(cfg.duckdb_path, len(api_tail_for_val) - 1, t_overlap)
+            if t_overlap == db_max_ts:
+                db_hist = db_tail.tail(k - 1).reset_index(drop=True)
+            else:
+                # API window has a hole at the DB tail; re-anchor the read at t_overlap
+                db_hist = read_last_n_rows_ending_before(cfg.duckdb_path, k - 1, t_overlap, con=con)
             v = validate_window(api_tail_for_val, db_hist, t_overlap)
             if not v.ok:
                 print(f"[ERROR] overlap validation failed: {v.reason}", file=sys.stderr)
                 return 2
             # Append rows strictly after DB max timestamp
-            to_append = closed_df[closed_df["timestamp"] > db_max_ts].copy()
+            to_append = closed_df[closed_df["timestamp"] > db_max_ts]
 
         if to_append.empty:
             if cfg.debug:
                 print("[INFO] Catch-up: DB is up to date; nothing to append")
+        elif cfg.dry_run:
+            if cfg.debug:
+                for row in to_append.to_dict("records"):
+                    print("[DRY-RUN] Would append:", row)
+            appended = len(to_append)
         else:
-            for _, row in to_append.iterrows():
-                if cfg.dry_run:
-                    if cfg.debug:
-                        print("[DRY-RUN] Would append:", row.to_dict())
-                else:
-                    append_row_if_absent(cfg.duckdb_path, row)
-                appended += 1
+            # Single set-based insert instead of one guarded INSERT per row
+            appended = append_rows_if_absent(cfg.duckdb_path, to_append, con=con)
     else:
-        # Read DB window for validation: last N-1 rows ending at t-1
-        db_window = read_last_n_rows_ending_before(cfg.duckdb_path, cfg.n_recent - 1, target_hour)
-
-        # Validate single-hour append
-        v = validate_window(closed_df, db_window, target_hour)
+        # Validate single-hour append; the DB window [t-N+1, t-1] is compared inside DuckDB
+        v = validate_window_in_db(closed_df, cfg.duckdb_path, target_hour, con=con)
 
         allow_bootstrap = False
-        if not v.ok and len(db_window) == 0:
+        if not v.ok and read_last_n_rows_ending_before(cfg.duckdb_path, 1, target_hour, con=con).empty:
             allow_bootstrap = True
             if cfg.debug:
                 print("[INFO] bootstrap: no DB history; appending target hour without full validation")
 
         if v.ok or allow_bootstrap:
             # Append only bar at t
-            row_t = closed_df.tail(1).iloc[0]
             if cfg.dry_run:
                 if cfg.debug:
-                    print("[DRY-RUN] Would append:", row_t.to_dict())
+                    print("[DRY-RUN] Would append:", closed_df.iloc[-1].to_dict())
             else:
-                append_row_if_absent(cfg.duckdb_path, row_t)
+                open_ms = int(closed_df["_open_time_ms"].iloc[-1])
+                o, h, l, c, vol = closed_df[["open", "high", "low", "close", "volume"]].to_numpy()[-1].tolist()
+                append_values_if_absent(cfg.duckdb_path, (open_ms, o, h, l, c, vol), con=con)
             appended = 1
         else:
             print(f"[WARN] validation failed: {v.reason}")
@@ -154,6 +193,12 @@ def parse_args(argv: Optional[list[str]] = None) -> RunConfig:
     p.add_argument("--dry-run", action="store_true", help="Do not write to DB")
     p.add_argument("--debug", action="store_true", help="Verbose logging")
     p.add_argument("--catch-up", action="store_true", help="Append all missing closed bars in the API window after validating overlap")
+    p.add_argument(
+        "--snapshot-format",
+        choices=["csv", "parquet"],
+        default="csv",
+        help="Raw snapshot format (parquet requires pyarrow)",
+    )
     args = p.parse_args(argv)
 
     return RunConfig(
@@ -164,6 +209,7 @@ def parse_args(argv: Optional[list[str]] = None) -> RunConfig:
         dry_run=args.dry_run,
         debug=args.debug,
         catch_up=args.catch_up,
+        snapshot_format=args.snapshot_format,
     )
 
 
@@ -1,10 +1,12 @@
 from __future__ import annotations
 
+from contextlib import contextmanager
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, Optional
 
 import duckdb  # type: ignore
+import numpy as np
 import pandas as pd
 
 
@@ -21,42 +23,88 @@ def _connect(db_path: Path):
     return duckdb.connect(str(db_path))
 
 
-def ensure_table(db_path: Path) -> None:
-    """Create OHLCV table if not exists. Also runs migration to add snapshot_time if needed."""
+@contextmanager
+def connect(db_path: Path) -> Iterator[duckdb.DuckDBPyConnection]:
+    """Open one UTC DuckDB connection to share across helpers via their `con` argument."""
     con = _connect(db_path)
     try:
-        con.execute(
-            f"""
-            CREATE TABLE IF NOT EXISTS {TABLE_NAME} (
-              timestamp TIMESTAMP,
-              snapshot_time TIMESTAMP,
-              open DOUBLE,
-              high DOUBLE,
-              low DOUBLE,
-              close DOUBLE,
-              volume DOUBLE,
-              created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            );
+        con.execute("SET TimeZone='UTC';")
+        yield con
+    finally:
+        con.close()
+
+
+@contextmanager
+def _session(db_path: Path, con: Optional[duckdb.DuckDBPyConnection]) -> Iterator[duckdb.DuckDBPyConnection]:
+    """Yield the caller's connection as-is, or open (and close) one for db_path."""
+    if con is not None:
+        yield con
+    else:
+        with connect(db_path) as own:
+            yield own
+
+
+@contextmanager
+def transaction(con: duckdb.DuckDBPyConnection) -> Iterator[duckdb.DuckDBPyConnection]:
+    """Run the enclosed statements as one explicit transaction (one commit instead of one per statement)."""
+    con.execute("BEGIN TRANSACTION;")
+    try:
+        yield con
+    except BaseException:
+        con.execute("ROLLBACK;")
+        raise
+    else:
+        con.execute("COMMIT;")
+
+
+def ensure_table(db_path: Path, con: Optional[duckdb.DuckDBPyConnection] = None) -> None:
+    """Create OHLCV table if not exists. Also runs migration to add snapshot_time if needed.
+
+    Checks the catalog first so an already-migrated table costs one lookup, not DDL.
+    """
+    with _session(db_path, con) as con:
+        has_table, has_snapshot_time, has_index = con.execute(
             """
-        )
-        # Lightweight uniqueness guard via index; DuckDB does not enforce PK by default
-        con.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS idx_{TABLE_NAME}_ts ON {TABLE_NAME}(timestamp);")
-        
-        # Migration: Add snapshot_time column if it doesn't exist (for existing tables)
-        try:
+            SELECT
+              EXISTS (SELECT 1 FROM information_schema.tables WHERE table_name = ?),
+              EXISTS (SELECT 1 FROM information_schema.columns WHERE table_name = ? AND column_name = 'snapshot_time'),
+              EXISTS (SELECT 1 FROM duckdb_indexes() WHERE index_name = ?)
+            """,
+            [TABLE_NAME, TABLE_NAME, f"idx_{TABLE_NAME}_ts"],
+        ).fetchone()
+        if has_table and has_snapshot_time and has_index:
+            return
+
+        if not has_table:
+            con.execute(
+                f"""
+                CREATE TABLE IF NOT EXISTS {TABLE_NAME} (
+                  timestamp TIMESTAMP,
+                  snapshot_time TIMESTAMP,
+                  open DOUBLE,
+                  high DOUBLE,
+                  low DOUBLE,
+                  close DOUBLE,
+                  volume DOUBLE,
+                  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                );
+                """
+            )
+        elif not has_snapshot_time:
+            # Migration: Add snapshot_time column for existing tables
             con.execute(f"ALTER TABLE {TABLE_NAME} ADD COLUMN snapshot_time TIMESTAMP;")
             # Backfill: snapshot_time = timestamp + 1 hour for existing rows
             con.execute(f"UPDATE {TABLE_NAME} SET snapshot_time = timestamp + INTERVAL '1 hour' WHERE snapshot_time IS NULL;")
-        except duckdb.CatalogException:
-            pass  # Column already exists
-    finally:
-        con.close()
 
+        if not has_index:
+            # Lightweight uniqueness guard via index; DuckDB does not enforce PK by default
+            con.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS idx_{TABLE_NAME}_ts ON {TABLE_NAME}(timestamp);")
 
-def read_last_n_rows_ending_before(db_path: Path, n: int, end_exclusive: pd.Timestamp) -> pd.DataFrame:
-    con = _connect(db_path)
-    try:
-        con.execute("SET TimeZone='UTC';")
+
+def read_last_n_rows_ending_before(
+    db_path: Path, n: int, end_exclusive: pd.Timestamp, con: Optional[duckdb.DuckDBPyConnection] = None
+) -> pd.DataFrame:
+    with _session(db_path, con) as con:
         q = f"""
             SELECT timestamp, snapshot_time, open, high, low, close, volume
             FROM {TABLE_NAME}
@@ -67,48 +115,167 @@ def read_last_n_rows_ending_before(db_path: Path, n: int, end_exclusive: pd.Time
         df = con.execute(q, [end_exclusive.to_pydatetime(), n]).fetch_df()
         df = df.sort_values("timestamp").reset_index(drop=True)
         return df
-    finally:
-        con.close()
 
 
-def append_row_if_absent(db_path: Path, row: pd.Series) -> None:
+# Guarded single-row inserts, built once at import. DuckDB's Python API exposes no reusable
+# prepared-statement handle (executemany is its only prepare-once entry point).
+_INSERT_ROW_IF_ABSENT_SQL = f"""
+    INSERT INTO {TABLE_NAME} (timestamp, snapshot_time, open, high, low, close, volume)
+    SELECT ?, ?, ?, ?, ?, ?, ?
+    WHERE NOT EXISTS (
+        SELECT 1 FROM {TABLE_NAME} WHERE timestamp = ?
+    );
+"""
+_INSERT_VALUES_IF_ABSENT_SQL = f"""
+    INSERT INTO {TABLE_NAME} (timestamp, snapshot_time, open, high, low, close, volume)
+    SELECT epoch_ms(?), epoch_ms(?) + INTERVAL 1 HOUR, ?, ?, ?, ?, ?
+    WHERE NOT EXISTS (
+        SELECT 1 FROM {TABLE_NAME} WHERE timestamp = epoch_ms(?)
+    );
+"""
+
+
+def append_row_if_absent(db_path: Path, row: pd.Series, con: Optional[duckdb.DuckDBPyConnection] = None) -> None:
     """Append a single row if timestamp does not already exist."""
-    con = _connect(db_path)
-    try:
-        con.execute("SET TimeZone='UTC';")
+    ts = pd.to_datetime(row["timestamp"]).to_pydatetime()
+    with _session(db_path, con) as con:
         con.execute(
-            f"""
-            INSERT INTO {TABLE_NAME} (timestamp, snapshot_time, open, high, low, close, volume)
-            SELECT ?, ?, ?, ?, ?, ?, ?
-            WHERE NOT EXISTS (
-                SELECT 1 FROM {TABLE_NAME} WHERE timestamp = ?
-            );
-            """,
+            _INSERT_ROW_IF_ABSENT_SQL,
             [
-                pd.to_datetime(row["timestamp"]).to_pydatetime(),
+                ts,
                 pd.to_datetime(row["snapshot_time"]).to_pydatetime(),
                 float(row["open"]),
                 float(row["high"]),
                 float(row["low"]),
                 float(row["close"]),
                 float(row["volume"]),
-                pd.to_datetime(row["timestamp"]).to_pydatetime(),
+                ts,
             ],
         )
-    finally:
-        con.close()
 
 
-def coverage_stats(db_path: Path) -> Optional[tuple[pd.Timestamp, pd.Timestamp, int]]:
-    con = _connect(db_path)
-    try:
+def append_values_if_absent(
+    db_path: Path,
+    values: tuple,
+    con: Optional[duckdb.DuckDBPyConnection] = None,
+) -> None:
+    """Append one bar given as a plain (open_time_ms, open, high, low, close, volume) tuple.
+
+    The raw epoch-ms open time is turned into a TIMESTAMP by epoch_ms() in SQL, so no
+    Python datetime is built; snapshot_time is the bar close (timestamp + 1h).
+    """
+    open_time_ms = int(values[0])
+    with _session(db_path, con) as con:
+        con.execute(_INSERT_VALUES_IF_ABSENT_SQL, [open_time_ms, open_time_ms, *values[1:], open_time_ms])
+
+
+def _append_absent(con: duckdb.DuckDBPyConnection, table: str, df: pd.DataFrame, columns: list[str]) -> int:
+    """Append df[columns] rows whose timestamp is not yet in table through DuckDB's appender.
+
+    Existing timestamps in the frame's range are fetched with one query and filtered out in
+    pandas, so no per-row probe or parameterized INSERT is involved. Returns rows appended.
+    """
+    if df.empty:
+        return 0
+    # Duplicates within the frame would otherwise collide on the primary key; the first wins,
+    # as with a per-row guarded insert
+    df = df.drop_duplicates("timestamp", keep="first")
+    ts = df["timestamp"]
+    existing = con.execute(
+        f"SELECT timestamp FROM {table} WHERE timestamp BETWEEN ? AND ?",
+        [ts.min().to_pydatetime(), ts.max().to_pydatetime()],
+    ).fetchnumpy()["timestamp"]
+    new = df.loc[~ts.isin(existing), columns] if len(existing) else df[columns]
+    if new.empty:
+        return 0
+    con.append(table, new, by_name=True)
+    return len(new)
+
+
+def append_rows_if_absent(db_path: Path, df: pd.DataFrame, con: Optional[duckdb.DuckDBPyConnection] = None) -> int:
+    """Append all rows of df whose timestamp does not already exist, in one appender call.
+
+    Returns the number of rows inserted.
+    """
+    with _session(db_path, con) as con:
+        return _append_absent(con, TABLE_NAME, df, ["timestamp", "snapshot_time", "open", "high", "low", "close", "volume"])
+
+
+def coverage_stats(
+    db_path: Path, con: Optional[duckdb.DuckDBPyConnection] = None
+) -> Optional[tuple[pd.Timestamp, pd.Timestamp, int]]:
+    with _session(db_path, con) as con:
         q = f"SELECT MIN(timestamp), MAX(timestamp), COUNT(*) FROM {TABLE_NAME}"
         res = con.execute(q).fetchone()
         if res is None or res[0] is None:
             return None
         return pd.Timestamp(res[0]), pd.Timestamp(res[1]), int(res[2])
-    finally:
-        con.close()
+
+
+def read_overlap_bundle(
+    db_path: Path, n: int, con: Optional[duckdb.DuckDBPyConnection] = None
+) -> tuple[Optional[pd.Timestamp], pd.DataFrame]:
+    """Return (MAX(timestamp), last n rows strictly before it) in one query.
+
+    Catch-up validation anchors at the DB tail, so this replaces coverage_stats plus
+    read_last_n_rows_ending_before. Returns (None, empty frame) when the table is empty.
+    """
+    with _session(db_path, con) as con:
+        q = f"""
+            WITH agg AS (SELECT MAX(timestamp) AS max_ts FROM {TABLE_NAME}),
+            tail AS (
+              SELECT timestamp, snapshot_time, open, high, low, close, volume
+              FROM {TABLE_NAME}
+              WHERE timestamp < (SELECT max_ts FROM agg)
+              ORDER BY timestamp DESC
+              LIMIT ?
+            )
+            SELECT agg.max_ts, tail.*
+            FROM agg LEFT JOIN tail ON TRUE
+            ORDER BY tail.timestamp
+        """
+        df = con.execute(q, [n]).fetch_df()
+        max_ts = df["max_ts"].iloc[0]
+        if pd.isna(max_ts):
+            return None, df.iloc[0:0].drop(columns="max_ts")
+        tail = df.drop(columns="max_ts").dropna(subset=["timestamp"]).reset_index(drop=True)
+        return pd.Timestamp(max_ts), tail
+
+
+def window_diff_stats(
+    db_path: Path,
+    api_hist: pd.DataFrame,
+    end_exclusive: pd.Timestamp,
+    con: Optional[duckdb.DuckDBPyConnection] = None,
+) -> tuple[int, int, np.ndarray]:
+    """Compare api_hist against the last len(api_hist) DB rows before end_exclusive, in SQL.
+
+    Returns (db_rows, matched_timestamps, max_abs_diff per open/high/low/close/volume).
+    NULL or NaN on either side surfaces as NaN in max_abs_diff.
+    """
+    cols = ["open", "high", "low", "close", "volume"]
+    diffs = ",\n".join(f"MAX(COALESCE(ABS(d.{c} - a.{c}), 'NaN'::DOUBLE))" for c in cols)
+    with _session(db_path, con) as con:
+        con.register("tmp_api", api_hist[["timestamp", *cols]])
+        try:
+            res = con.execute(
+                f"""
+                WITH d AS (
+                  SELECT timestamp, {", ".join(cols)}
+                  FROM {TABLE_NAME}
+                  WHERE timestamp < ?
+                  ORDER BY timestamp DESC
+                  LIMIT ?
+                )
+                SELECT (SELECT COUNT(*) FROM d), COUNT(a.timestamp), {diffs}
+                FROM d JOIN tmp_api a ON d.timestamp = a.timestamp
+                """,
+                [end_exclusive.to_pydatetime(), len(api_hist)],
+            ).fetchone()
+        finally:
+            con.unregister("tmp_api")
+    max_diff = np.array([np.nan if x is None else x for x in res[2:]], dtype=np.float64)
+    return int(res[0]), int(res[1]), max_diff
 
 
 # -----------------------------------------------------------------------------
@@ -118,10 +285,9 @@ def coverage_stats(db_path: Path) -> Optional[tuple[pd.Timestamp, pd.Timestamp,
 TABLE_OHLCV_FULL = "ohlcv_btcusdt_1h_full"
 
 
-def ensure_table_ohlcv_full(db_path: Path) -> None:
+def ensure_table_ohlcv_full(db_path: Path, con: Optional[duckdb.DuckDBPyConnection] = None) -> None:
     """Create ohlcv_btcusdt_1h_full table if not exists."""
-    con = _connect(db_path)
-    try:
+    with _session(db_path, con) as con:
         con.execute(
             f"""
             CREATE TABLE IF NOT EXISTS {TABLE_OHLCV_FULL} (
@@ -141,15 +307,11 @@ def ensure_table_ohlcv_full(db_path: Path) -> None:
             """
         )
         con.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS idx_{TABLE_OHLCV_FULL}_ts ON {TABLE_OHLCV_FULL}(timestamp);")
-    finally:
-        con.close()
 
 
-def append_ohlcv_full_if_absent(db_path: Path, row: pd.Series) -> None:
+def append_ohlcv_full_if_absent(db_path: Path, row: pd.Series, con: Optional[duckdb.DuckDBPyConnection] = None) -> None:
     """Append a single row to ohlcv_btcusdt_1h_full if timestamp does not already exist."""
-    con = _connect(db_path)
-    try:
-        con.execute("SET TimeZone='UTC';")
+    with _session(db_path, con) as con:
         con.execute(
             f"""
             INSERT INTO {TABLE_OHLCV_FULL} (
@@ -176,15 +338,25 @@ def append_ohlcv_full_if_absent(db_path: Path, row: pd.Series) -> None:
                 pd.to_datetime(row["timestamp"]).to_pydatetime(),
             ],
         )
-    finally:
-        con.close()
 
 
-def read_last_n_ohlcv_full(db_path: Path, n: int, end_exclusive: pd.Timestamp) -> pd.DataFrame:
+_OHLCV_FULL_COLUMNS = [
+    "timestamp", "snapshot_time", "open", "high", "low", "close", "volume",
+    "quote_asset_volume", "num_trades", "taker_buy_base_volume", "taker_buy_quote_volume",
+]
+
+
+def append_ohlcv_full_rows_if_absent(db_path: Path, df: pd.DataFrame, con: Optional[duckdb.DuckDBPyConnection] = None) -> int:
+    """Append all rows of df not yet in ohlcv_btcusdt_1h_full by timestamp; returns rows inserted."""
+    with _session(db_path, con) as con:
+        return _append_absent(con, TABLE_OHLCV_FULL, df, _OHLCV_FULL_COLUMNS)
+
+
+def read_last_n_ohlcv_full(
+    db_path: Path, n: int, end_exclusive: pd.Timestamp, con: Optional[duckdb.DuckDBPyConnection] = None
+) -> pd.DataFrame:
     """Read last n rows from ohlcv_btcusdt_1h_full ending before given timestamp."""
-    con = _connect(db_path)
-    try:
-        con.execute("SET TimeZone='UTC';")
+    with _session(db_path, con) as con:
         q = f"""
             SELECT timestamp, snapshot_time, open, high, low, close, volume,
                    quote_asset_volume, num_trades, taker_buy_base_volume, taker_buy_quote_volume
@@ -196,8 +368,6 @@ def read_last_n_ohlcv_full(db_path: Path, n: int, end_exclusive: pd.Timestamp) -
         df = con.execute(q, [end_exclusive.to_pydatetime(), n]).fetch_df()
         df = df.sort_values("timestamp").reset_index(drop=True)
         return df
-    finally:
-        con.close()
 
 
 # -----------------------------------------------------------------------------
@@ -207,9 +377,8 @@ def read_last_n_ohlcv_full(db_path: Path, n: int, end_exclusive: pd.Timestamp) -
 TABLE_OPEN_INTEREST = "open_interest_btcusdt_1h"
 
 
-def ensure_table_open_interest(db_path: Path) -> None:
-    con = _connect(db_path)
-    try:
+def ensure_table_open_interest(db_path: Path, con: Optional[duckdb.DuckDBPyConnection] = None) -> None:
+    with _session(db_path, con) as con:
         con.execute(
             f"""
             CREATE TABLE IF NOT EXISTS {TABLE_OPEN_INTEREST} (
@@ -222,14 +391,10 @@ def ensure_table_open_interest(db_path: Path) -> None:
             """
         )
         con.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS idx_{TABLE_OPEN_INTEREST}_ts ON {TABLE_OPEN_INTEREST}(timestamp);")
-    finally:
-        con.close()
 
 
-def append_open_interest_if_absent(db_path: Path, row: pd.Series) -> None:
-    con = _connect(db_path)
-    try:
-        con.execute("SET TimeZone='UTC';")
+def append_open_interest_if_absent(db_path: Path, row: pd.Series, con: Optional[duckdb.DuckDBPyConnection] = None) -> None:
+    with _session(db_path, con) as con:
         con.execute(
             f"""
             INSERT INTO {TABLE_OPEN_INTEREST} (timestamp, snapshot_time, sum_open_interest, sum_open_interest_value)
@@ -246,14 +411,21 @@ def append_open_interest_if_absent(db_path: Path, row: pd.Series) -> None:
                 pd.to_datetime(row["timestamp"]).to_pydatetime(),
             ],
         )
-    finally:
-        con.close()
 
 
-def read_last_n_open_interest(db_path: Path, n: int, end_exclusive: pd.Timestamp) -> pd.DataFrame:
-    con = _connect(db_path)
-    try:
-        con.execute("SET TimeZone='UTC';")
+_OPEN_INTEREST_COLUMNS = ["timestamp", "snapshot_time", "sum_open_interest", "sum_open_interest_value"]
+
+
+def append_open_interest_rows_if_absent(db_path: Path, df: pd.DataFrame, con: Optional[duckdb.DuckDBPyConnection] = None) -> int:
+    """Append all rows of df not yet in open_interest_btcusdt_1h by timestamp; returns rows inserted."""
+    with _session(db_path, con) as con:
+        return _append_absent(con, TABLE_OPEN_INTEREST, df, _OPEN_INTEREST_COLUMNS)
+
+
+def read_last_n_open_interest(
+    db_path: Path, n: int, end_exclusive: pd.Timestamp, con: Optional[duckdb.DuckDBPyConnection] = None
+) -> pd.DataFrame:
+    with _session(db_path, con) as con:
         q = f"""
             SELECT timestamp, snapshot_time, sum_open_interest, sum_open_interest_value
             FROM {TABLE_OPEN_INTEREST}
@@ -264,8 +436,6 @@ def read_last_n_open_interest(db_path: Path, n: int, end_exclusive: pd.Timestamp
         df = con.execute(q, [end_exclusive.to_pydatetime(), n]).fetch_df()
         df = df.sort_values("timestamp").reset_index(drop=True)
         return df
-    finally:
-        con.close()
 
 
 # -----------------------------------------------------------------------------
@@ -275,9 +445,8 @@ def read_last_n_open_interest(db_path: Path, n: int, end_exclusive: pd.Timestamp
 TABLE_LONG_SHORT_RATIO = "long_short_ratio_btcusdt_1h"
 
 
-def ensure_table_long_short_ratio(db_path: Path) -> None:
-    con = _connect(db_path)
-    try:
+def ensure_table_long_short_ratio(db_path: Path, con: Optional[duckdb.DuckDBPyConnection] = None) -> None:
+    with _session(db_path, con) as con:
         con.execute(
             f"""
             CREATE TABLE IF NOT EXISTS {TABLE_LONG_SHORT_RATIO} (
@@ -291,14 +460,10 @@ def ensure_table_long_short_ratio(db_path: Path) -> None:
             """
         )
         con.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS idx_{TABLE_LONG_SHORT_RATIO}_ts ON {TABLE_LONG_SHORT_RATIO}(timestamp);")
-    finally:
-        con.close()
 
 
-def append_long_short_ratio_if_absent(db_path: Path, row: pd.Series) -> None:
-    con = _connect(db_path)
-    try:
-        con.execute("SET TimeZone='UTC';")
+def append_long_short_ratio_if_absent(db_path: Path, row: pd.Series, con: Optional[duckdb.DuckDBPyConnection] = None) -> None:
+    with _session(db_path, con) as con:
         con.execute(
             f"""
             INSERT INTO {TABLE_LONG_SHORT_RATIO} (timestamp, snapshot_time, long_short_ratio, long_account, short_account)
@@ -316,14 +481,21 @@ def append_long_short_ratio_if_absent(db_path: Path, row: pd.Series) -> None:
                 pd.to_datetime(row["timestamp"]).to_pydatetime(),
             ],
         )
-    finally:
-        con.close()
 
 
-def read_last_n_long_short_ratio(db_path: Path, n: int, end_exclusive: pd.Timestamp) -> pd.DataFrame:
-    con = _connect(db_path)
-    try:
-        con.execute("SET TimeZone='UTC';")
+_LONG_SHORT_RATIO_COLUMNS = ["timestamp", "snapshot_time", "long_short_ratio", "long_account", "short_account"]
+
+
+def append_long_short_ratio_rows_if_absent(db_path: Path, df: pd.DataFrame, con: Optional[duckdb.DuckDBPyConnection] = None) -> int:
+    """Append all rows of df not yet in long_short_ratio_btcusdt_1h by timestamp; returns rows inserted."""
+    with _session(db_path, con) as con:
+        return _append_absent(con, TABLE_LONG_SHORT_RATIO, df, _LONG_SHORT_RATIO_COLUMNS)
+
+
+def read_last_n_long_short_ratio(
+    db_path: Path, n: int, end_exclusive: pd.Timestamp, con: Optional[duckdb.DuckDBPyConnection] = None
+) -> pd.DataFrame:
+    with _session(db_path, con) as con:
         q = f"""
             SELECT timestamp, snapshot_time, long_short_ratio, long_account, short_account
             FROM {TABLE_LONG_SHORT_RATIO}
@@ -334,8 +506,6 @@ def read_last_n_long_short_ratio(db_path: Path, n: int, end_exclusive: pd.Timest
         df = con.execute(q, [end_exclusive.to_pydatetime(), n]).fetch_df()
         df = df.sort_values("timestamp").reset_index(drop=True)
         return df
-    finally:
-        con.close()
 
 
 # -----------------------------------------------------------------------------
@@ -345,9 +515,8 @@ def read_last_n_long_short_ratio(db_path: Path, n: int, end_exclusive: pd.Timest
 TABLE_PREMIUM_INDEX = "premium_index_btcusdt_1h"
 
 
-def ensure_table_premium_index(db_path: Path) -> None:
-    con = _connect(db_path)
-    try:
+def ensure_table_premium_index(db_path: Path, con: Optional[duckdb.DuckDBPyConnection] = None) -> None:
+    with _session(db_path, con) as con:
         con.execute(
             f"""
             CREATE TABLE IF NOT EXISTS {TABLE_PREMIUM_INDEX} (
@@ -362,14 +531,10 @@ def ensure_table_premium_index(db_path: Path) -> None:
             """
         )
         con.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS idx_{TABLE_PREMIUM_INDEX}_ts ON {TABLE_PREMIUM_INDEX}(timestamp);")
-    finally:
-        con.close()
 
 
-def append_premium_index_if_absent(db_path: Path, row: pd.Series) -> None:
-    con = _connect(db_path)
-    try:
-        con.execute("SET TimeZone='UTC';")
+def append_premium_index_if_absent(db_path: Path, row: pd.Series, con: Optional[duckdb.DuckDBPyConnection] = None) -> None:
+    with _session(db_path, con) as con:
         con.execute(
             f"""
             INSERT INTO {TABLE_PREMIUM_INDEX} (timestamp, snapshot_time, open, high, low, close)
@@ -388,14 +553,21 @@ def append_premium_index_if_absent(db_path: Path, row: pd.Series) -> None:
                 pd.to_datetime(row["timestamp"]).to_pydatetime(),
             ],
         )
-    finally:
-        con.close()
 
 
-def read_last_n_premium_index(db_path: Path, n: int, end_exclusive: pd.Timestamp) -> pd.DataFrame:
-    con = _connect(db_path)
-    try:
-        con.execute("SET TimeZone='UTC';")
+_PREMIUM_INDEX_COLUMNS = ["timestamp", "snapshot_time", "open", "high", "low", "close"]
+
+
+def append_premium_index_rows_if_absent(db_path: Path, df: pd.DataFrame, con: Optional[duckdb.DuckDBPyConnection] = None) -> int:
+    """Append all rows of df not yet in premium_index_btcusdt_1h by timestamp; returns rows inserted."""
+    with _session(db_path, con) as con:
+        return _append_absent(con, TABLE_PREMIUM_INDEX, df, _PREMIUM_INDEX_COLUMNS)
+
+
+def read_last_n_premium_index(
+    db_path: Path, n: int, end_exclusive: pd.Timestamp, con: Optional[duckdb.DuckDBPyConnection] = None
+) -> pd.DataFrame:
+    with _session(db_path, con) as con:
         q = f"""
             SELECT timestamp, snapshot_time, open, high, low, close
             FROM {TABLE_PREMIUM_INDEX}
@@ -406,8 +578,6 @@ def read_last_n_premium_index(db_path: Path, n: int, end_exclusive: pd.Timestamp
         df = con.execute(q, [end_exclusive.to_pydatetime(), n]).fetch_df()
         df = df.sort_values("timestamp").reset_index(drop=True)
         return df
-    finally:
-        con.close()
 
 
 # -----------------------------------------------------------------------------
@@ -418,9 +588,8 @@ def read_last_n_premium_index(db_path: Path, n: int, end_exclusive: pd.Timestamp
 TABLE_SPOT_OHLCV = "ohlcv_btcusdt_1h"
 
 
-def ensure_table_spot_ohlcv(db_path: Path) -> None:
-    con = _connect(db_path)
-    try:
+def ensure_table_spot_ohlcv(db_path: Path, con: Optional[duckdb.DuckDBPyConnection] = None) -> None:
+    with _session(db_path, con) as con:
         con.execute(
             f"""
             CREATE TABLE IF NOT EXISTS {TABLE_SPOT_OHLCV} (
@@ -438,14 +607,10 @@ def ensure_table_spot_ohlcv(db_path: Path) -> None:
             """
         )
         con.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS idx_{TABLE_SPOT_OHLCV}_ts ON {TABLE_SPOT_OHLCV}(timestamp);")
-    finally:
-        con.close()
 
 
-def append_spot_ohlcv_if_absent(db_path: Path, row: pd.Series) -> None:
-    con = _connect(db_path)
-    try:
-        con.execute("SET TimeZone='UTC';")
+def append_spot_ohlcv_if_absent(db_path: Path, row: pd.Series, con: Optional[duckdb.DuckDBPyConnection] = None) -> None:
+    with _session(db_path, con) as con:
         con.execute(
             f"""
             INSERT INTO {TABLE_SPOT_OHLCV} (timestamp, snapshot_time, open, high, low, close, volume, num_trades, taker_buy_base_volume)
@@ -467,14 +632,21 @@ def append_spot_ohlcv_if_absent(db_path: Path, row: pd.Series) -> None:
                 pd.to_datetime(row["timestamp"]).to_pydatetime(),
             ],
         )
-    finally:
-        con.close()
 
 
-def read_last_n_spot_ohlcv(db_path: Path, n: int, end_exclusive: pd.Timestamp) -> pd.DataFrame:
-    con = _connect(db_path)
-    try:
-        con.execute("SET TimeZone='UTC';")
+_SPOT_OHLCV_COLUMNS = ["timestamp", "snapshot_time", "open", "high", "low", "close", "volume", "num_trades", "taker_buy_base_volume"]
+
+
+def append_spot_ohlcv_rows_if_absent(db_path: Path, df: pd.DataFrame, con: Optional[duckdb.DuckDBPyConnection] = None) -> int:
+    """Append all rows of df not yet in the spot ohlcv_btcusdt_1h table by timestamp; returns rows inserted."""
+    with _session(db_path, con) as con:
+        return _append_absent(con, TABLE_SPOT_OHLCV, df, _SPOT_OHLCV_COLUMNS)
+
+
+def read_last_n_spot_ohlcv(
+    db_path: Path, n: int, end_exclusive: pd.Timestamp, con: Optional[duckdb.DuckDBPyConnection] = None
+) -> pd.DataFrame:
+    with _session(db_path, con) as con:
         q = f"""
             SELECT timestamp, snapshot_time, open, high, low, close, volume, num_trades, taker_buy_base_volume
             FROM {TABLE_SPOT_OHLCV}
@@ -485,6 +657,4 @@ def read_last_n_spot_ohlcv(db_path: Path, n: int, end_exclusive: pd.Timestamp) -
         df = con.execute(q, [end_exclusive.to_pydatetime(), n]).fetch_df()
         df = df.sort_values("timestamp").reset_index(drop=True)
         return df
-    finally:
-        con.close()
 
@@ -3,6 +3,7 @@ from __future__ import annotations
 import csv
 from dataclasses import dataclass
 from datetime import datetime, timezone
+from functools import cached_property
 from pathlib import Path
 
 import pandas as pd
@@ -13,22 +14,35 @@ class PersistConfig:
     root_dir: Path
     dataset_slug: str
 
-    def dataset_dir(self) -> Path:
+    @cached_property
+    def _dataset_dir(self) -> Path:
+        # cached_property stores on the instance __dict__, so this works on a frozen dataclass
         d = self.root_dir / self.dataset_slug
         d.mkdir(parents=True, exist_ok=True)
         return d
 
+    def dataset_dir(self) -> Path:
+        """Dataset directory, created on first use only."""
+        return self._dataset_dir
+
 
 def now_utc_run_id() -> str:
     return datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%SZ")
 
 
+SNAPSHOT_COLUMNS = ["timestamp", "open", "high", "low", "close", "volume"]
+
+
 def write_raw_snapshot(cfg: PersistConfig, run_id: str, df: pd.DataFrame) -> Path:
     out = cfg.dataset_dir() / f"{run_id}_api_pull.csv"
-    # Ensure column order
-    cols = ["timestamp", "open", "high", "low", "close", "volume"]
-    df_to_write = df.loc[:, cols].copy()
-    # Persist as CSV with ISO-like timestamp
-    df_to_write.to_csv(out, index=False)
+    # Persist as CSV with ISO-like timestamp; columns= fixes the order without an intermediate frame.
+    # An explicit date_format keeps the text independent of the frame's datetime unit.
+    df.to_csv(out, columns=SNAPSHOT_COLUMNS, index=False, date_format="%Y-%m-%d %H:%M:%S")
     return out
 
+
+def write_raw_snapshot_parquet(cfg: PersistConfig, run_id: str, df: pd.DataFrame) -> Path:
+    """Columnar alternative to write_raw_snapshot (requires pyarrow)."""
+    out = cfg.dataset_dir() / f"{run_id}_api_pull.parquet"
+    df.loc[:, SNAPSHOT_COLUMNS].to_parquet(out, engine="pyarrow", compression="zstd", index=False)
+    return out
@@ -1,11 +1,16 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import List
+from typing import List, Optional
 
+import numpy as np
 import pandas as pd
 
 
+_ONE_HOUR = np.timedelta64(1, "h")
+_OHLCV_COLS = ["open", "high", "low", "close", "volume"]
+
+
 @dataclass(frozen=True)
 class ValidationResult:
     ok: bool
@@ -14,37 +19,50 @@ class ValidationResult:
 
 
 def _is_strictly_hourly(df: pd.DataFrame) -> bool:
-    if df.empty:
-        return True
-    diffs = df["timestamp"].diff().dropna().dt.total_seconds()
-    return (diffs == 3600).all()
+    # Unit-agnostic datetime64 diff; avoids the .dt accessor and float seconds
+    vals = np.sort(df["timestamp"].to_numpy())
+    return vals.size < 2 or bool((np.diff(vals) == _ONE_HOUR).all())
 
 
-def validate_window(api_df: pd.DataFrame, db_df: pd.DataFrame, target_hour: pd.Timestamp, tolerance: float = 1e-8) -> ValidationResult:
-    """Validate that API window [t-N+1, t-1] matches DB last N-1 rows.
-
-    - Ensures timestamps match exactly and are hourly spaced.
-    - Compares OHLCV values with absolute tolerance.
-    - api_df must include at least one row at t (target_hour); that row is not part of validation set.
-    """
+def precheck_window(api_df: pd.DataFrame, target_hour: pd.Timestamp) -> Optional[ValidationResult]:
+    """API-side checks shared by both validators; None means go on to compare with the DB."""
     if api_df.empty:
         return ValidationResult(False, "api_df empty", 0)
 
     if api_df.iloc[-1]["timestamp"] != target_hour:
         return ValidationResult(False, "api last row is not target_hour", 0)
 
-    # Validation window excludes the last row (t)
-    api_hist = api_df.iloc[:-1].copy()
-    if api_hist.empty:
+    if len(api_df) == 1:
         # Nothing to validate, allow append of t
         return ValidationResult(True, "no historical window to validate", 0)
 
-    if not _is_strictly_hourly(api_df[["timestamp"]].copy().assign(dummy=0)):
-        # Recompute hourly spacing on timestamps only
-        ts = api_df["timestamp"].sort_values().reset_index(drop=True)
-        diffs = ts.diff().dropna().dt.total_seconds()
-        if not (diffs == 3600).all():
-            return ValidationResult(False, "api window not strictly hourly", 0)
+    if not _is_strictly_hourly(api_df):
+        return ValidationResult(False, "api window not strictly hourly", 0)
+    return None
+
+
+def _check_max_diff(max_diff: np.ndarray, tolerance: float, validated_rows: int) -> ValidationResult:
+    bad = np.flatnonzero(np.isnan(max_diff) | (max_diff > tolerance))
+    if bad.size:
+        i = int(bad[0])
+        if np.isnan(max_diff[i]):
+            return ValidationResult(False, f"NaN in column {_OHLCV_COLS[i]}", 0)
+        return ValidationResult(False, f"mismatch in {_OHLCV_COLS[i]} (max diff {max_diff[i]})", 0)
+    return ValidationResult(True, "validated", validated_rows)
+
+
+def validate_window(api_df: pd.DataFrame, db_df: pd.DataFrame, target_hour: pd.Timestamp, tolerance: float = 1e-8) -> ValidationResult:
+    """Validate that API window [t-N+1, t-1] matches DB last N-1 rows.
+
+    - Ensures timestamps match exactly and are hourly spaced.
+    - Compares OHLCV values with absolute tolerance.
+    - api_df must include at least one row at t (target_hour); that row is not part of validation set.
+    """
+    early = precheck_window(api_df, target_hour)
+    if early is not None:
+        return early
+    # Validation window excludes the last row (t)
+    api_hist = api_df.iloc[:-1]
 
     # DB rows must match length of api_hist to compare fully
     if len(db_df) < len(api_hist):
@@ -55,16 +73,28 @@ def validate_window(api_df: pd.DataFrame, db_df: pd.DataFrame, target_hour: pd.T
     api_hist = api_hist.reset_index(drop=True)
 
     # Timestamps must match exactly
-    if not (db_tail["timestamp"].tolist() == api_hist["timestamp"].tolist()):
+    if not np.array_equal(db_tail["timestamp"].to_numpy(), api_hist["timestamp"].to_numpy()):
         return ValidationResult(False, "timestamp mismatch between api and db", 0)
 
-    # Compare values within tolerance
-    for col in ["open", "high", "low", "close", "volume"]:
-        diff = (db_tail[col] - api_hist[col]).abs().max()
-        if pd.isna(diff):
-            return ValidationResult(False, f"NaN in column {col}", 0)
-        if diff > tolerance:
-            return ValidationResult(False, f"mismatch in {col} (max diff {diff})", 0)
+    # Compare values within tolerance: one (n, 5) diff instead of a Series per column
+    a = api_hist[_OHLCV_COLS].to_numpy(dtype=np.float64)
+    b = db_tail[_OHLCV_COLS].to_numpy(dtype=np.float64)
+    max_diff = np.abs(a - b).max(axis=0)  # NaN propagates through max
+    return _check_max_diff(max_diff, tolerance, len(api_hist))
+
+
+def validate_diff_stats(
+    db_rows: int, matched: int, max_diff: np.ndarray, validated_rows: int, tolerance: float = 1e-8
+) -> ValidationResult:
+    """Same DB-side checks as validate_window, applied to aggregates computed elsewhere.
 
-    return ValidationResult(True, "validated", len(api_hist))
+    db_rows/matched/max_diff are the DB window size, the timestamps it shares with the
+    validated_rows API rows, and the per-column max abs diff (see db.window_diff_stats).
+    """
+    if db_rows < validated_rows:
+        return ValidationResult(False, "db has fewer rows than validation window", 0)
+    # Both sides hold validated_rows distinct timestamps, so a full join means they are identical
+    if matched != validated_rows:
+        return ValidationResult(False, "timestamp mismatch between api and db", 0)
+    return _check_max_diff(max_diff, tolerance, validated_rows)
 
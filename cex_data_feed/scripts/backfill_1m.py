@@ -49,9 +49,7 @@ from cex_data_feed.scripts.download_binance_daily_klines import (
     download_if_needed as daily_download,
 )
 from cex_data_feed.scripts.merge_binance_klines import (
-    iter_zip_csv_lines,
-    is_header_line,
-    process_line,
+    merge_zip,
     BINANCE_KLINE_HEADER,
 )
 from cex_data_feed.scripts.backfill_1m_from_csv import run_backfill
@@ -148,18 +146,16 @@ def _merge_zips(symbol: str, zip_dir: str, out_csv: str, dry_run: bool, debug: b
         return 0
 
     total_rows = 0
-    with open(out_csv, "w", encoding="utf-8", newline="\n") as f:
-        f.write(",".join(BINANCE_KLINE_HEADER) + "\n")
+    with open(out_csv, "wb") as f:
+        f.write((",".join(BINANCE_KLINE_HEADER) + "\n").encode("utf-8"))
         for idx, zp in enumerate(zip_paths, 1):
             base = os.path.basename(zp)
             if debug:
                 print(f"  [{idx}/{len(zip_paths)}] {base}")
-            for line in iter_zip_csv_lines(zp):
-                if is_header_line(line):
-                    continue
-                processed, _ = process_line(line, "futures")
-                f.write(processed + "\n")
-                total_rows += 1
+            # merge_zip drops any header line and returns the converted rows as one chunk
+            chunk, rows, _ = merge_zip(zp, "futures")
+            f.write(chunk)
+            total_rows += rows
 
     print(f"  Merged {total_rows:,} rows")
     return total_rows
@@ -15,6 +15,10 @@ Essential steps:
   - Optional range filter via --start/--end
   - Insert: append-only into DuckDB table, skipping existing timestamps
 
+By default (--engine duckdb) the CSV is parsed, inspected and cleaned inside
+DuckDB via read_csv, so rows never round-trip through pandas; --engine pandas
+keeps the DataFrame path.
+
 Usage example:
   python feed_binance_btcusdt_perp/backfill_ohlcv_binance_1h_from_csv.py \
     --csv "/Volumes/Extreme SSD/trading_data/cex/ohlvc/binance_btcusdt_perp_1h/merged.csv" \
@@ -24,6 +28,7 @@ Usage example:
 
 import argparse
 import sys
+from contextlib import closing
 from pathlib import Path
 from typing import Optional
 
@@ -37,7 +42,7 @@ import duckdb  # type: ignore
 import numpy as np
 import pandas as pd
 
-from cex_data_feed.binance.db import ensure_table, TABLE_NAME
+from cex_data_feed.binance.db import connect, ensure_table, TABLE_NAME
 
 
 BINANCE_KLINE_HEADER = [
@@ -68,6 +73,23 @@ def _read_csv_with_header_detection(path: Path) -> pd.DataFrame:
     return df
 
 
+_ONE_HOUR = np.timedelta64(1, "h")
+# Binance 1h close_time is open_time + 3_599_999 ms; accept the [59:59, 1:00:00] window
+_CLOSE_DELTA_MIN_MS = 3_599_000
+_CLOSE_DELTA_MAX_MS = 3_600_000
+
+
+def _hourly_gap_count(ts: np.ndarray) -> int:
+    """Count non-1h steps in a sorted datetime64 array (any unit, no NaT)."""
+    return int(np.count_nonzero(np.diff(ts) != _ONE_HOUR))
+
+
+def _close_delta_ok(open_time: pd.Series, close_time: pd.Series) -> np.ndarray:
+    """Per-row check that close_time - open_time (raw epoch ms) is ~1h."""
+    delta = close_time.to_numpy() - open_time.to_numpy()
+    return (delta >= _CLOSE_DELTA_MIN_MS) & (delta <= _CLOSE_DELTA_MAX_MS)
+
+
 def inspect_dataframe(df: pd.DataFrame) -> None:
     print(f"[INSPECT] rows={len(df):,}")
     if "open_time" not in df.columns:
@@ -83,18 +105,14 @@ def inspect_dataframe(df: pd.DataFrame) -> None:
     if dup_cnt:
         print(f"[INSPECT] duplicate timestamps: {dup_cnt}")
     # Hourly spacing check
-    diffs = ts.sort_values().diff().dropna().dt.total_seconds().values
-    if diffs.size:
-        ok = np.all(diffs == 3600)
-        gaps = int((diffs != 3600).sum())
-        print(f"[INSPECT] hourly_continuous={ok} gaps={gaps}")
+    ts_sorted = np.sort(ts.dropna().to_numpy())
+    if ts_sorted.size > 1:
+        gaps = _hourly_gap_count(ts_sorted)
+        print(f"[INSPECT] hourly_continuous={gaps == 0} gaps={gaps}")
     # close_time sanity
     if "close_time" in df.columns:
-        ct = pd.to_datetime(df["close_time"], unit="ms", utc=True).dt.tz_convert("UTC").dt.tz_localize(None)
-        delta = (ct - ts).dt.total_seconds()
-        if not delta.empty:
-            ok_close = bool(((delta >= 3599) & (delta <= 3600)).all())
-            print(f"[INSPECT] close_time ~1h after open_time: {ok_close}")
+        ok_close = bool(_close_delta_ok(df["open_time"], df["close_time"]).all())
+        print(f"[INSPECT] close_time ~1h after open_time: {ok_close}")
 
 
 def clean_transform(
@@ -103,26 +121,30 @@ def clean_transform(
     start: Optional[pd.Timestamp] = None,
     end: Optional[pd.Timestamp] = None,
 ) -> pd.DataFrame:
-    # Normalize column names
-    df = df.copy()
-    df.columns = [str(c).strip().lower() for c in df.columns]
+    # Normalize column names by lookup; the input frame is only read, never copied
+    cols = {str(c).strip().lower(): df[c] for c in df.columns}
     required = {"open_time", "open", "high", "low", "close", "volume"}
-    missing = required - set(df.columns)
+    missing = required - set(cols)
     if missing:
         raise ValueError(f"missing required columns in CSV: {sorted(missing)}")
 
-    out = pd.DataFrame({
-        "timestamp": pd.to_datetime(df["open_time"], unit="ms", utc=True).dt.tz_convert("UTC").dt.tz_localize(None),
-        "open": pd.to_numeric(df["open"], errors="coerce"),
-        "high": pd.to_numeric(df["high"], errors="coerce"),
-        "low": pd.to_numeric(df["low"], errors="coerce"),
-        "close": pd.to_numeric(df["close"], errors="coerce"),
-        "volume": pd.to_numeric(df["volume"], errors="coerce"),
-    })
+    data = {
+        "timestamp": pd.to_datetime(cols["open_time"], unit="ms", utc=True).dt.tz_convert("UTC").dt.tz_localize(None),
+        "open": pd.to_numeric(cols["open"], errors="coerce"),
+        "high": pd.to_numeric(cols["high"], errors="coerce"),
+        "low": pd.to_numeric(cols["low"], errors="coerce"),
+        "close": pd.to_numeric(cols["close"], errors="coerce"),
+        "volume": pd.to_numeric(cols["volume"], errors="coerce"),
+    }
+    # Carried through the cleaning steps so the close_time check stays row-aligned
+    has_close = "close_time" in cols
+    if has_close:
+        data["_close_ok"] = _close_delta_ok(cols["open_time"], cols["close_time"])
+    out = pd.DataFrame(data)
 
     # Drop rows with NaNs in required fields
     before = len(out)
-    out = out.dropna(subset=["timestamp", "open", "high", "low", "close", "volume"]).copy()
+    out = out.dropna(subset=["timestamp", "open", "high", "low", "close", "volume"])
     dropped_nan = before - len(out)
     if dropped_nan:
         print(f"[CLEAN] dropped rows with NaNs: {dropped_nan}")
@@ -143,52 +165,228 @@ def clean_transform(
     out = out.reset_index(drop=True)
 
     # Hourly continuity check
-    diffs = out["timestamp"].diff().dropna().dt.total_seconds().values
-    gaps = int((diffs != 3600).sum()) if diffs.size else 0
+    gaps = _hourly_gap_count(out["timestamp"].to_numpy())
     print(f"[CHECK] rows={len(out):,} range={out['timestamp'].iloc[0]}..{out['timestamp'].iloc[-1]} gaps={gaps}")
 
     # Close time sanity if present
-    if "close_time" in df.columns:
-        ct = pd.to_datetime(df.loc[out.index, "close_time"], unit="ms", utc=True).dt.tz_convert("UTC").dt.tz_localize(None)
-        delta = (ct.values - out["timestamp"].values).astype("timedelta64[s]").astype(int)
-        close_bad = int(((delta < 3599) | (delta > 3600)).sum())
+    if has_close:
+        close_bad = int(np.count_nonzero(~out.pop("_close_ok").to_numpy()))
         if close_bad:
             print(f"[WARN] rows with unexpected close_time delta: {close_bad}")
 
     return out
 
 
+# DuckDB ingest throughput plateaus around this batch size; larger frames are chunked
+INSERT_CHUNK_ROWS = 100_000
+INSERT_CHUNK_THRESHOLD = 1_000_000
+
+
+def _db_max_timestamp(con):
+    return con.execute(f"SELECT MAX(timestamp) FROM {TABLE_NAME}").fetchone()[0]
+
+
 def insert_into_duckdb(db_path: Path, df: pd.DataFrame) -> int:
-    ensure_table(db_path)
-    con = duckdb.connect(str(db_path))
-    try:
+    with connect(db_path) as con:
+        ensure_table(db_path, con=con)
+        if df.empty:
+            return 0
+        db_max_ts = _db_max_timestamp(con)
+        if db_max_ts is None or df["timestamp"].min() > db_max_ts:
+            # Every row lies past the DB tail (df is deduped), so no existence check is needed:
+            # the appender bypasses the planner entirely
+            con.append(TABLE_NAME, df[["timestamp", "open", "high", "low", "close", "volume"]], by_name=True)
+            return len(df)
+        chunk = INSERT_CHUNK_ROWS if len(df) > INSERT_CHUNK_THRESHOLD else max(len(df), 1)
+        inserted = 0
+        for i in range(0, len(df), chunk):
+            con.register("tmp_df", df.iloc[i : i + chunk])
+            # Insert only missing (NOT EXISTS is broadly supported); DuckDB reports the inserted count
+            inserted += con.execute(
+                f"""
+                INSERT INTO {TABLE_NAME} (timestamp, open, high, low, close, volume)
+                SELECT t.timestamp, t.open, t.high, t.low, t.close, t.volume
+                FROM tmp_df t
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM {TABLE_NAME} d WHERE d.timestamp = t.timestamp
+                )
+                """
+            ).fetchone()[0]
+            con.unregister("tmp_df")
+        return int(inserted)
+
+
+# -----------------------------------------------------------------------------
+# DuckDB-native path: read_csv + SQL inspect/clean/insert (no pandas round-trip)
+# -----------------------------------------------------------------------------
+
+_NOT_NULL = " AND ".join(f"{c} IS NOT NULL" for c in ["timestamp", "open", "high", "low", "close", "volume"])
+
+
+def _csv_select_sql(path: Path) -> str:
+    """SELECT over read_csv yielding typed rows (rn, timestamp, OHLCV, close_delta_ms) in file order."""
+    with open(path, "r", encoding="utf-8-sig") as f:
+        first = f.readline().rstrip("\r\n")
+    names = [c.strip().lower() for c in first.split(",")]
+    has_header = "open_time" in names
+    if not has_header:
+        names = BINANCE_KLINE_HEADER
+    missing = {"open_time", "open", "high", "low", "close", "volume"} - set(names)
+    if missing:
+        raise ValueError(f"missing required columns in CSV: {sorted(missing)}")
+    names_sql = ", ".join("'" + n.replace("'", "''") + "'" for n in names)
+    close_delta = (
+        "TRY_CAST(close_time AS BIGINT) - TRY_CAST(open_time AS BIGINT)" if "close_time" in names else "NULL::BIGINT"
+    )
+    return f"""
+        SELECT
+          row_number() OVER () AS rn,
+          epoch_ms(TRY_CAST(open_time AS BIGINT)) AS timestamp,
+          TRY_CAST(open AS DOUBLE) AS open,
+          TRY_CAST(high AS DOUBLE) AS high,
+          TRY_CAST(low AS DOUBLE) AS low,
+          TRY_CAST(close AS DOUBLE) AS close,
+          TRY_CAST(volume AS DOUBLE) AS volume,
+          {close_delta} AS close_delta_ms
+        FROM read_csv(?, header={str(has_header).lower()}, all_varchar=true, names=[{names_sql}])
+    """
+
+
+def _hourly_gaps(con, table: str) -> tuple[int, int]:
+    """Return (gaps, diffs) over timestamps of table sorted ascending."""
+    gaps, diffs = con.execute(
+        f"""
+        SELECT COUNT(*) FILTER (WHERE d <> INTERVAL 1 HOUR), COUNT(d)
+        FROM (SELECT timestamp - LAG(timestamp) OVER (ORDER BY timestamp) AS d FROM {table} WHERE timestamp IS NOT NULL)
+        """
+    ).fetchone()
+    return int(gaps), int(diffs)
+
+
+def inspect_staged_csv(con) -> None:
+    """SQL counterpart of inspect_dataframe over the staged csv_raw table."""
+    rows, first_ts, last_ts, dup_cnt, close_ok = con.execute(
+        """
+        SELECT
+          COUNT(*),
+          arg_min(timestamp, rn),
+          arg_max(timestamp, rn),
+          COUNT(timestamp) - COUNT(DISTINCT timestamp),
+          bool_and(close_delta_ms BETWEEN 3599000 AND 3600000)
+        FROM csv_raw
+        """
+    ).fetchone()
+    print(f"[INSPECT] rows={rows:,}")
+    if not rows:
+        print("[INSPECT] empty timestamp series")
+        return
+    print(f"[INSPECT] ts_range: {first_ts} .. {last_ts}")
+    if dup_cnt:
+        print(f"[INSPECT] duplicate timestamps: {dup_cnt}")
+    gaps, diffs = _hourly_gaps(con, "csv_raw")
+    if diffs:
+        print(f"[INSPECT] hourly_continuous={gaps == 0} gaps={gaps}")
+    if close_ok is not None:
+        print(f"[INSPECT] close_time ~1h after open_time: {bool(close_ok)}")
+
+
+def clean_staged_csv(
+    con,
+    *,
+    start: Optional[pd.Timestamp] = None,
+    end: Optional[pd.Timestamp] = None,
+) -> int:
+    """SQL counterpart of clean_transform: builds csv_clean from csv_raw and returns the hourly gap count."""
+    dropped_nan, dups = con.execute(
+        f"""
+        SELECT
+          COUNT(*) FILTER (WHERE NOT ({_NOT_NULL})),
+          COUNT(*) FILTER (WHERE {_NOT_NULL}) - COUNT(DISTINCT timestamp) FILTER (WHERE {_NOT_NULL})
+        FROM csv_raw
+        """
+    ).fetchone()
+    if dropped_nan:
+        print(f"[CLEAN] dropped rows with NaNs: {dropped_nan}")
+    if dups:
+        print(f"[CLEAN] dropped duplicate timestamps: {dups}")
+
+    where = [_NOT_NULL]
+    params: list = []
+    if start is not None:
+        where.append("timestamp >= ?")
+        params.append(start.to_pydatetime())
+    if end is not None:
+        where.append("timestamp <= ?")
+        params.append(end.to_pydatetime())
+    # Keep the first occurrence (file order) of each timestamp, like drop_duplicates(keep="first")
+    con.execute(
+        f"""
+        CREATE OR REPLACE TEMP TABLE csv_clean AS
+        SELECT timestamp, open, high, low, close, volume, close_delta_ms
+        FROM csv_raw
+        WHERE {" AND ".join(where)}
+        QUALIFY row_number() OVER (PARTITION BY timestamp ORDER BY rn) = 1
+        ORDER BY timestamp
+        """,
+        params,
+    )
+
+    rows, ts_min, ts_max, close_bad = con.execute(
+        """
+        SELECT
+          COUNT(*),
+          MIN(timestamp),
+          MAX(timestamp),
+          COUNT(*) FILTER (WHERE close_delta_ms NOT BETWEEN 3599000 AND 3600000)
+        FROM csv_clean
+        """
+    ).fetchone()
+    gaps, _ = _hourly_gaps(con, "csv_clean")
+    print(f"[CHECK] rows={rows:,} range={ts_min}..{ts_max} gaps={gaps}")
+    if close_bad:
+        print(f"[WARN] rows with unexpected close_time delta: {close_bad}")
+    return gaps
+
+
+def insert_staged_csv(db_path: Path, con) -> int:
+    """Insert csv_clean rows whose timestamp is not already in the OHLCV table."""
+    ensure_table(db_path, con=con)
+    db_max_ts = _db_max_timestamp(con)
+    (csv_min_ts,) = con.execute("SELECT MIN(timestamp) FROM csv_clean").fetchone()
+    if csv_min_ts is None:
+        return 0
+    if db_max_ts is None or csv_min_ts > db_max_ts:
+        # Pure append past the DB tail: skip the anti-join against the existing table
+        where = ""
+    else:
+        where = f"WHERE NOT EXISTS (SELECT 1 FROM {TABLE_NAME} d WHERE d.timestamp = c.timestamp)"
+    inserted = con.execute(
+        f"""
+        INSERT INTO {TABLE_NAME} (timestamp, open, high, low, close, volume)
+        SELECT c.timestamp, c.open, c.high, c.low, c.close, c.volume
+        FROM csv_clean c
+        {where}
+        """
+    ).fetchone()[0]
+    return int(inserted)
+
+
+def _main_duckdb(args: argparse.Namespace, start: Optional[pd.Timestamp], end: Optional[pd.Timestamp]) -> int:
+    # Dry-run stages in memory so the target DB file is never created or locked
+    with (closing(duckdb.connect()) if args.dry_run else connect(args.duckdb)) as con:
         con.execute("SET TimeZone='UTC';")
-        con.register("tmp_df", df)
-        # Count missing rows relative to DB (use NOT EXISTS for compatibility)
-        to_insert = con.execute(
-            f"""
-            SELECT COUNT(*)
-            FROM tmp_df t
-            WHERE NOT EXISTS (
-                SELECT 1 FROM {TABLE_NAME} d WHERE d.timestamp = t.timestamp
-            )
-            """
-        ).fetchone()[0]
-        # Insert only missing (NOT EXISTS is broadly supported)
-        con.execute(
-            f"""
-            INSERT INTO {TABLE_NAME} (timestamp, open, high, low, close, volume)
-            SELECT t.timestamp, t.open, t.high, t.low, t.close, t.volume
-            FROM tmp_df t
-            WHERE NOT EXISTS (
-                SELECT 1 FROM {TABLE_NAME} d WHERE d.timestamp = t.timestamp
-            )
-            """
-        )
-        con.unregister("tmp_df")
-        return int(to_insert)
-    finally:
-        con.close()
+        con.execute(f"CREATE OR REPLACE TEMP TABLE csv_raw AS {_csv_select_sql(args.csv)}", [str(args.csv)])
+        inspect_staged_csv(con)
+        gaps = clean_staged_csv(con, start=start, end=end)
+        if gaps and args.stop_on_gap:
+            print(f"[ERROR] Hourly gaps detected after cleaning: {gaps}. Rerun without --stop-on-gap to continue.")
+            return 2
+        if args.dry_run:
+            print("[DRY-RUN] Skipping DB insert.")
+            return 0
+        inserted = insert_staged_csv(args.duckdb, con)
+    print(f"[INFO] Inserted {inserted} new rows into {TABLE_NAME} at {args.duckdb}")
+    return 0
 
 
 def parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
@@ -204,23 +402,31 @@ def parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
     p.add_argument("--end", type=str, default=None, help="End timestamp (inclusive)")
     p.add_argument("--stop-on-gap", action="store_true", help="Abort if hourly gaps are detected after cleaning")
     p.add_argument("--dry-run", action="store_true", help="Inspect and validate only; do not write to DB")
+    p.add_argument(
+        "--engine",
+        choices=["duckdb", "pandas"],
+        default="duckdb",
+        help="duckdb: parse and clean the CSV inside DuckDB (default); pandas: legacy DataFrame path",
+    )
     return p.parse_args(argv)
 
 
 def main(argv: Optional[list[str]] = None) -> int:
     args = parse_args(argv)
 
-    df_raw = _read_csv_with_header_detection(args.csv)
-    inspect_dataframe(df_raw)
-
     start = pd.to_datetime(args.start, utc=True).tz_convert("UTC").tz_localize(None) if args.start else None
     end = pd.to_datetime(args.end, utc=True).tz_convert("UTC").tz_localize(None) if args.end else None
 
+    if args.engine == "duckdb":
+        return _main_duckdb(args, start, end)
+
+    df_raw = _read_csv_with_header_detection(args.csv)
+    inspect_dataframe(df_raw)
+
     df = clean_transform(df_raw, start=start, end=end)
 
     # Post-clean continuity check
-    diffs = df["timestamp"].diff().dropna().dt.total_seconds().values
-    gaps = int((diffs != 3600).sum()) if diffs.size else 0
+    gaps = _hourly_gap_count(df["timestamp"].to_numpy())
     if gaps and args.stop_on_gap:
         print(f"[ERROR] Hourly gaps detected after cleaning: {gaps}. Rerun without --stop-on-gap to continue.")
         return 2
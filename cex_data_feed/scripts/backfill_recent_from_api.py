@@ -31,6 +31,8 @@ if __name__ == "__main__":
     if str(project_root) not in sys.path:
         sys.path.insert(0, str(project_root))
 
+import duckdb  # type: ignore
+import numpy as np
 import pandas as pd
 
 from cex_data_feed.binance.api import (
@@ -46,23 +48,25 @@ from cex_data_feed.binance.api import (
     spot_klines_to_dataframe,
 )
 from cex_data_feed.binance.db import (
+    connect,
+    transaction,
     ensure_table,
     read_last_n_rows_ending_before,
-    append_row_if_absent,
+    append_rows_if_absent,
     ensure_table_ohlcv_full,
-    append_ohlcv_full_if_absent,
+    append_ohlcv_full_rows_if_absent,
     read_last_n_ohlcv_full,
     ensure_table_open_interest,
-    append_open_interest_if_absent,
+    append_open_interest_rows_if_absent,
     read_last_n_open_interest,
     ensure_table_long_short_ratio,
-    append_long_short_ratio_if_absent,
+    append_long_short_ratio_rows_if_absent,
     read_last_n_long_short_ratio,
     ensure_table_premium_index,
-    append_premium_index_if_absent,
+    append_premium_index_rows_if_absent,
     read_last_n_premium_index,
     ensure_table_spot_ohlcv,
-    append_spot_ohlcv_if_absent,
+    append_spot_ohlcv_rows_if_absent,
     read_last_n_spot_ohlcv,
 )
 from cex_data_feed.binance.validation import validate_window as _vw
@@ -73,6 +77,9 @@ import yaml
 
 DEFAULT_SYMBOL = "BTCUSDT"
 DEFAULT_INTERVAL = "1h"
+OHLCV_COLS = ["open", "high", "low", "close", "volume"]
+_ONE_MS = np.timedelta64(1, "ms")
+_ONE_HOUR = np.timedelta64(1, "h")
 
 # Default config file path
 DEFAULT_CONFIG_PATH = Path(__file__).parent.parent / "config.yaml"
@@ -127,12 +134,12 @@ def _filter_closed(api_df: pd.DataFrame, now_floor: pd.Timestamp) -> pd.DataFram
     """Filter to only closed candles (close_time < now_floor)."""
     if "_close_time" not in api_df.columns:
         raise RuntimeError("API DataFrame missing _close_time column")
-    return api_df[api_df["_close_time"] <= now_floor - pd.Timedelta(milliseconds=1)].copy()
+    return api_df[api_df["_close_time"].to_numpy() <= now_floor.to_datetime64() - _ONE_MS]
 
 
 def _filter_closed_by_timestamp(api_df: pd.DataFrame, now_floor: pd.Timestamp) -> pd.DataFrame:
     """Filter to only complete hours (timestamp < now_floor) for APIs without close_time."""
-    return api_df[api_df["timestamp"] < now_floor].copy()
+    return api_df[api_df["timestamp"] < now_floor]
 
 
 def run_once(cfg: RunConfig) -> int:
@@ -140,9 +147,14 @@ def run_once(cfg: RunConfig) -> int:
     for db_path in [cfg.ohlcv_db, cfg.open_interest_db, cfg.long_short_ratio_db, 
                     cfg.premium_index_db, cfg.spot_ohlcv_db]:
         db_path.parent.mkdir(parents=True, exist_ok=True)
-    ensure_table(cfg.get_ohlcv_db())
-    ensure_table_ohlcv_full(cfg.get_ohlcv_db())  # Also ensure the full table exists
+    # One connection per DuckDB file for the whole run, threaded into every helper that touches it
+    with connect(cfg.get_ohlcv_db()) as con:
+        ensure_table(cfg.get_ohlcv_db(), con=con)
+        ensure_table_ohlcv_full(cfg.get_ohlcv_db(), con=con)  # Also ensure the full table exists
+        return _run_cycle(cfg, con)
 
+
+def _run_cycle(cfg: RunConfig, con: duckdb.DuckDBPyConnection) -> int:
     now_floor, target_hour = compute_target_hour()
 
     # Pull recent klines (always runs - main OHLCV)
@@ -150,28 +162,34 @@ def run_once(cfg: RunConfig) -> int:
     api_df_all = klines_to_dataframe(kl)
     
     # Add snapshot_time = close time (open + 1h for 1h candles)
-    api_df_all["snapshot_time"] = api_df_all["timestamp"] + pd.Timedelta(hours=1)
+    api_df_all["snapshot_time"] = api_df_all["timestamp"] + _ONE_HOUR
     
     api_df = _filter_closed(api_df_all, now_floor)
     if api_df.empty:
         print("[ERROR] No closed candles returned from API in the requested window", file=sys.stderr)
         return 2
 
-    last_closed_ts = api_df.iloc[-1]["timestamp"]
+    last_closed_ts = api_df["timestamp"].iloc[-1]
     if last_closed_ts != target_hour:
         print(
             f"[WARN] Last closed API bar {last_closed_ts} does not match target_hour {target_hour} (OK if within current hour)"
         )
 
     # Read DB window up to just before last_closed_ts+1h (so includes <= last_closed_ts)
-    db_tail = read_last_n_rows_ending_before(cfg.get_ohlcv_db(), cfg.db_validate_rows, last_closed_ts + pd.Timedelta(hours=1))
+    db_tail = read_last_n_rows_ending_before(cfg.get_ohlcv_db(), cfg.db_validate_rows, last_closed_ts + _ONE_HOUR, con=con)
 
     appended = 0
 
     if not db_tail.empty:
-        # Identify overlap timestamps between API window and DB tail
-        common_ts = sorted(set(api_df["timestamp"]).intersection(set(db_tail["timestamp"])))
-        if not common_ts:
+        # Overlap between API window and DB tail as one inner join on timestamp
+        merged = api_df[["timestamp", *OHLCV_COLS]].merge(
+            db_tail[["timestamp", *OHLCV_COLS]],
+            on="timestamp",
+            how="inner",
+            suffixes=("_api", "_db"),
+            validate="1:1",
+        )
+        if merged.empty:
             print(
                 f"[ERROR] No overlap between API window (min={api_df['timestamp'].min()}, max={api_df['timestamp'].max()}) "
                 f"and DB tail (min={db_tail['timestamp'].min()}, max={db_tail['timestamp'].max()}). Consider increasing --n-recent/--db-validate-rows.",
@@ -180,46 +198,52 @@ def run_once(cfg: RunConfig) -> int:
             return 2
 
         # Build overlap series and validate using the shared validator, anchored at the last overlap as t
-        api_overlap = api_df[api_df["timestamp"].isin(common_ts)].sort_values("timestamp").reset_index(drop=True)
-        t_overlap = api_overlap.iloc[-1]["timestamp"]
-        # Read DB rows ending at t_overlap - 1h for validation window size len(api_overlap)-1
-        db_hist = read_last_n_rows_ending_before(cfg.get_ohlcv_db(), max(len(api_overlap) - 1, 0), t_overlap)
+        api_cols = [f"{c}_api" for c in OHLCV_COLS]
+        api_overlap = merged[["timestamp", *api_cols]].set_axis(["timestamp", *OHLCV_COLS], axis=1)
+        t_overlap = api_overlap["timestamp"].iloc[-1]
+        # DB rows before t_overlap for validation window size len(api_overlap)-1. Every overlap row
+        # is in db_tail, so the last len(api_overlap)-1 DB rows before t_overlap are too: slice, don't re-query
+        db_hist = db_tail[db_tail["timestamp"] < t_overlap].tail(max(len(api_overlap) - 1, 0)).reset_index(drop=True)
 
         v = _vw(api_overlap, db_hist, t_overlap, tolerance=cfg.tolerance)
         if not v.ok:
             print(f"[ERROR] Overlap validation failed: {v.reason}", file=sys.stderr)
             return 2
 
-        # Additionally, ensure values for the last overlap row match DB within tolerance
-        db_at_t = db_tail[db_tail["timestamp"] == t_overlap]
-        if not db_at_t.empty:
-            row_api = api_overlap.tail(1).iloc[0]
-            row_db = db_at_t.tail(1).iloc[0]
-            for col in ["open", "high", "low", "close", "volume"]:
-                if abs(float(row_api[col]) - float(row_db[col])) > cfg.tolerance:
-                    print(f"[ERROR] Mismatch at {t_overlap} in {col}: api={row_api[col]} db={row_db[col]}", file=sys.stderr)
-                    return 2
+        # Additionally, every overlap row (including t_overlap) must match the DB tail within tolerance
+        a_vals = merged[api_cols].to_numpy(dtype=np.float64)
+        d_vals = merged[[f"{c}_db" for c in OHLCV_COLS]].to_numpy(dtype=np.float64)
+        bad = np.argwhere(np.abs(a_vals - d_vals) > cfg.tolerance)
+        if bad.size:
+            i, j = bad[0]
+            print(
+                f"[ERROR] Mismatch at {merged['timestamp'].iloc[i]} in {OHLCV_COLS[j]}: "
+                f"api={a_vals[i, j]} db={d_vals[i, j]}",
+                file=sys.stderr,
+            )
+            return 2
         if cfg.debug:
-            print(f"[INFO] overlap rows validated: {len(common_ts)}; last_overlap={t_overlap}")
+            print(f"[INFO] overlap rows validated: {len(merged)}; last_overlap={t_overlap}")
 
         # Determine missing rows to append: strictly after DB max timestamp
         db_max_ts = db_tail["timestamp"].max()
-        to_append = api_df[api_df["timestamp"] > db_max_ts].copy()
+        to_append = api_df[api_df["timestamp"] > db_max_ts]
     else:
         # Bootstrap: DB empty, append entire API closed window
-        to_append = api_df.copy()
+        to_append = api_df
 
     if to_append.empty:
         print("[INFO] No new rows to append; DB is up to date vs API window")
     else:
-        # Append sequentially to preserve order
-        for _, row in to_append.iterrows():
-            if cfg.dry_run:
-                if cfg.debug:
-                    print("[DRY-RUN] Would append:", row.to_dict())
-            else:
-                append_row_if_absent(cfg.get_ohlcv_db(), row)
-            appended += 1
+        if cfg.dry_run:
+            if cfg.debug:
+                for row in to_append.to_dict("records"):
+                    print("[DRY-RUN] Would append:", row)
+            appended = len(to_append)
+        else:
+            # One set-based guarded insert instead of a statement per row
+            with transaction(con):
+                appended = append_rows_if_absent(cfg.get_ohlcv_db(), to_append, con=con)
 
         ts_min = to_append['timestamp'].min()
         ts_max = to_append['timestamp'].max()
@@ -229,35 +253,41 @@ def run_once(cfg: RunConfig) -> int:
 
     # --- OHLCV Full (with trade fields) ---
     # Always backfill this table using its own DB tail check
-    _backfill_ohlcv_full(cfg, api_df_all, now_floor)
+    _backfill_ohlcv_full(cfg, api_df_all, now_floor, con)
 
     # --- Open Interest ---
     if cfg.include_open_interest:
-        _backfill_open_interest(cfg, now_floor)
+        with connect(cfg.get_open_interest_db()) as open_interest_con:
+            _backfill_open_interest(cfg, now_floor, open_interest_con)
 
     # --- Long/Short Ratio ---
     if cfg.include_long_short_ratio:
-        _backfill_long_short_ratio(cfg, now_floor)
+        with connect(cfg.get_long_short_ratio_db()) as long_short_ratio_con:
+            _backfill_long_short_ratio(cfg, now_floor, long_short_ratio_con)
 
     # --- Premium Index ---
     if cfg.include_premium_index:
-        _backfill_premium_index(cfg, now_floor)
+        with connect(cfg.get_premium_index_db()) as premium_index_con:
+            _backfill_premium_index(cfg, now_floor, premium_index_con)
 
     # --- Spot OHLCV ---
     if cfg.include_spot_ohlcv:
-        _backfill_spot_ohlcv(cfg, now_floor)
+        with connect(cfg.get_spot_ohlcv_db()) as spot_ohlcv_con:
+            _backfill_spot_ohlcv(cfg, now_floor, spot_ohlcv_con)
 
     return 0
 
 
-def _backfill_ohlcv_full(cfg: RunConfig, api_df_all: pd.DataFrame, now_floor: pd.Timestamp) -> None:
+def _backfill_ohlcv_full(
+    cfg: RunConfig, api_df_all: pd.DataFrame, now_floor: pd.Timestamp, con: duckdb.DuckDBPyConnection
+) -> None:
     """Backfill ohlcv_btcusdt_1h_full table with trade fields.
     
     Uses its own DB tail check to determine what rows need to be appended.
     This ensures the full table catches up independently of the original table.
     """
     db_path = cfg.get_ohlcv_db()
-    ensure_table_ohlcv_full(db_path)
+    ensure_table_ohlcv_full(db_path, con=con)
     
     # Filter to closed candles
     api_df = _filter_closed(api_df_all, now_floor)
@@ -266,34 +296,34 @@ def _backfill_ohlcv_full(cfg: RunConfig, api_df_all: pd.DataFrame, now_floor: pd
         print("[INFO] OHLCV Full: No closed data returned")
         return
     
-    last_closed_ts = api_df.iloc[-1]["timestamp"]
-    db_tail = read_last_n_ohlcv_full(db_path, cfg.db_validate_rows, last_closed_ts + pd.Timedelta(hours=1))
+    last_closed_ts = api_df["timestamp"].iloc[-1]
+    db_tail = read_last_n_ohlcv_full(db_path, cfg.db_validate_rows, last_closed_ts + _ONE_HOUR, con=con)
     
     if not db_tail.empty:
         db_max_ts = db_tail["timestamp"].max()
-        to_append = api_df[api_df["timestamp"] > db_max_ts].copy()
+        to_append = api_df[api_df["timestamp"] > db_max_ts]
     else:
-        to_append = api_df.copy()
+        to_append = api_df
     
     if to_append.empty:
         print("[INFO] OHLCV Full: No new rows to append")
         return
     
-    appended = 0
-    for _, row in to_append.iterrows():
-        if cfg.dry_run:
-            if cfg.debug:
-                print("[DRY-RUN] Would append ohlcv_full:", row.to_dict())
-        else:
-            append_ohlcv_full_if_absent(db_path, row)
-        appended += 1
+    if cfg.dry_run:
+        if cfg.debug:
+            for row in to_append.to_dict("records"):
+                print("[DRY-RUN] Would append ohlcv_full:", row)
+        appended = len(to_append)
+    else:
+        with transaction(con):
+            appended = append_ohlcv_full_rows_if_absent(db_path, to_append, con=con)
     
     ts_min = to_append['timestamp'].min()
     ts_max = to_append['timestamp'].max()
     print(f"[INFO] OHLCV Full: appended={appended} range=[{ts_min}..{ts_max}]")
 
 
-def _backfill_long_short_ratio(cfg: RunConfig, now_floor: pd.Timestamp) -> None:
+def _backfill_long_short_ratio(cfg: RunConfig, now_floor: pd.Timestamp, con: duckdb.DuckDBPyConnection) -> None:
     """Backfill long/short ratio data.
     
     Note: API timestamp is the snapshot time. We store:
@@ -301,14 +331,14 @@ def _backfill_long_short_ratio(cfg: RunConfig, now_floor: pd.Timestamp) -> None:
       - timestamp = snapshot_time - 1h (aligned with OHLCV candle open time)
     """
     db_path = cfg.get_long_short_ratio_db()
-    ensure_table_long_short_ratio(db_path)
+    ensure_table_long_short_ratio(db_path, con=con)
 
     ratios = fetch_long_short_ratio(DEFAULT_SYMBOL, period="1h", limit=cfg.n_recent)
     api_df = long_short_ratio_to_dataframe(ratios)
     
     # Transform timestamps: API returns snapshot_time, we align to OHLCV candle
     api_df["snapshot_time"] = api_df["timestamp"]
-    api_df["timestamp"] = api_df["snapshot_time"] - pd.Timedelta(hours=1)
+    api_df["timestamp"] = api_df["snapshot_time"] - _ONE_HOUR
     
     api_df = _filter_closed_by_timestamp(api_df, now_floor)
 
@@ -316,34 +346,34 @@ def _backfill_long_short_ratio(cfg: RunConfig, now_floor: pd.Timestamp) -> None:
         print("[INFO] Long/Short Ratio: No closed data returned")
         return
 
-    last_closed_ts = api_df.iloc[-1]["timestamp"]
-    db_tail = read_last_n_long_short_ratio(db_path, cfg.db_validate_rows, last_closed_ts + pd.Timedelta(hours=1))
+    last_closed_ts = api_df["timestamp"].iloc[-1]
+    db_tail = read_last_n_long_short_ratio(db_path, cfg.db_validate_rows, last_closed_ts + _ONE_HOUR, con=con)
 
     if not db_tail.empty:
         db_max_ts = db_tail["timestamp"].max()
-        to_append = api_df[api_df["timestamp"] > db_max_ts].copy()
+        to_append = api_df[api_df["timestamp"] > db_max_ts]
     else:
-        to_append = api_df.copy()
+        to_append = api_df
 
     if to_append.empty:
         print("[INFO] Long/Short Ratio: No new rows to append")
         return
 
-    appended = 0
-    for _, row in to_append.iterrows():
-        if cfg.dry_run:
-            if cfg.debug:
-                print("[DRY-RUN] Would append long_short_ratio:", row.to_dict())
-        else:
-            append_long_short_ratio_if_absent(db_path, row)
-        appended += 1
+    if cfg.dry_run:
+        if cfg.debug:
+            for row in to_append.to_dict("records"):
+                print("[DRY-RUN] Would append long_short_ratio:", row)
+        appended = len(to_append)
+    else:
+        with transaction(con):
+            appended = append_long_short_ratio_rows_if_absent(db_path, to_append, con=con)
 
     ts_min = to_append['timestamp'].min()
     ts_max = to_append['timestamp'].max()
     print(f"[INFO] Long/Short Ratio: appended={appended} range=[{ts_min}..{ts_max}]")
 
 
-def _backfill_open_interest(cfg: RunConfig, now_floor: pd.Timestamp) -> None:
+def _backfill_open_interest(cfg: RunConfig, now_floor: pd.Timestamp, con: duckdb.DuckDBPyConnection) -> None:
     """Backfill open interest statistics.
     
     Note: API timestamp is the snapshot time. We store:
@@ -351,14 +381,14 @@ def _backfill_open_interest(cfg: RunConfig, now_floor: pd.Timestamp) -> None:
       - timestamp = snapshot_time - 1h (aligned with OHLCV candle open time)
     """
     db_path = cfg.get_open_interest_db()
-    ensure_table_open_interest(db_path)
+    ensure_table_open_interest(db_path, con=con)
 
     oi_list = fetch_open_interest_hist(DEFAULT_SYMBOL, period="1h", limit=cfg.n_recent)
     api_df = open_interest_hist_to_dataframe(oi_list)
     
     # Transform timestamps: API returns snapshot_time, we align to OHLCV candle
     api_df["snapshot_time"] = api_df["timestamp"]
-    api_df["timestamp"] = api_df["snapshot_time"] - pd.Timedelta(hours=1)
+    api_df["timestamp"] = api_df["snapshot_time"] - _ONE_HOUR
     
     api_df = _filter_closed_by_timestamp(api_df, now_floor)
 
@@ -366,34 +396,34 @@ def _backfill_open_interest(cfg: RunConfig, now_floor: pd.Timestamp) -> None:
         print("[INFO] Open Interest: No closed data returned")
         return
 
-    last_closed_ts = api_df.iloc[-1]["timestamp"]
-    db_tail = read_last_n_open_interest(db_path, cfg.db_validate_rows, last_closed_ts + pd.Timedelta(hours=1))
+    last_closed_ts = api_df["timestamp"].iloc[-1]
+    db_tail = read_last_n_open_interest(db_path, cfg.db_validate_rows, last_closed_ts + _ONE_HOUR, con=con)
 
     if not db_tail.empty:
         db_max_ts = db_tail["timestamp"].max()
-        to_append = api_df[api_df["timestamp"] > db_max_ts].copy()
+        to_append = api_df[api_df["timestamp"] > db_max_ts]
     else:
-        to_append = api_df.copy()
+        to_append = api_df
 
     if to_append.empty:
         print("[INFO] Open Interest: No new rows to append")
         return
 
-    appended = 0
-    for _, row in to_append.iterrows():
-        if cfg.dry_run:
-            if cfg.debug:
-                print("[DRY-RUN] Would append open_interest:", row.to_dict())
-        else:
-            append_open_interest_if_absent(db_path, row)
-        appended += 1
+    if cfg.dry_run:
+        if cfg.debug:
+            for row in to_append.to_dict("records"):
+                print("[DRY-RUN] Would append open_interest:", row)
+        appended = len(to_append)
+    else:
+        with transaction(con):
+            appended = append_open_interest_rows_if_absent(db_path, to_append, con=con)
 
     ts_min = to_append['timestamp'].min()
     ts_max = to_append['timestamp'].max()
     print(f"[INFO] Open Interest: appended={appended} range=[{ts_min}..{ts_max}]")
 
 
-def _backfill_premium_index(cfg: RunConfig, now_floor: pd.Timestamp) -> None:
+def _backfill_premium_index(cfg: RunConfig, now_floor: pd.Timestamp, con: duckdb.DuckDBPyConnection) -> None:
     """Backfill premium index klines.
     
     Note: This is OHLCV-like data. We store:
@@ -401,13 +431,13 @@ def _backfill_premium_index(cfg: RunConfig, now_floor: pd.Timestamp) -> None:
       - snapshot_time = timestamp + 1h (candle close)
     """
     db_path = cfg.get_premium_index_db()
-    ensure_table_premium_index(db_path)
+    ensure_table_premium_index(db_path, con=con)
 
     klines = fetch_premium_index_klines(DEFAULT_SYMBOL, DEFAULT_INTERVAL, cfg.n_recent)
     api_df = klines_to_dataframe(klines)
     
     # Add snapshot_time = close time (open + 1h for 1h candles)
-    api_df["snapshot_time"] = api_df["timestamp"] + pd.Timedelta(hours=1)
+    api_df["snapshot_time"] = api_df["timestamp"] + _ONE_HOUR
     
     api_df = _filter_closed(api_df, now_floor)
 
@@ -415,34 +445,34 @@ def _backfill_premium_index(cfg: RunConfig, now_floor: pd.Timestamp) -> None:
         print("[INFO] Premium Index: No closed data returned")
         return
 
-    last_closed_ts = api_df.iloc[-1]["timestamp"]
-    db_tail = read_last_n_premium_index(db_path, cfg.db_validate_rows, last_closed_ts + pd.Timedelta(hours=1))
+    last_closed_ts = api_df["timestamp"].iloc[-1]
+    db_tail = read_last_n_premium_index(db_path, cfg.db_validate_rows, last_closed_ts + _ONE_HOUR, con=con)
 
     if not db_tail.empty:
         db_max_ts = db_tail["timestamp"].max()
-        to_append = api_df[api_df["timestamp"] > db_max_ts].copy()
+        to_append = api_df[api_df["timestamp"] > db_max_ts]
     else:
-        to_append = api_df.copy()
+        to_append = api_df
 
     if to_append.empty:
         print("[INFO] Premium Index: No new rows to append")
         return
 
-    appended = 0
-    for _, row in to_append.iterrows():
-        if cfg.dry_run:
-            if cfg.debug:
-                print("[DRY-RUN] Would append premium_index:", row.to_dict())
-        else:
-            append_premium_index_if_absent(db_path, row)
-        appended += 1
+    if cfg.dry_run:
+        if cfg.debug:
+            for row in to_append.to_dict("records"):
+                print("[DRY-RUN] Would append premium_index:", row)
+        appended = len(to_append)
+    else:
+        with transaction(con):
+            appended = append_premium_index_rows_if_absent(db_path, to_append, con=con)
 
     ts_min = to_append['timestamp'].min()
     ts_max = to_append['timestamp'].max()
     print(f"[INFO] Premium Index: appended={appended} range=[{ts_min}..{ts_max}]")
 
 
-def _backfill_spot_ohlcv(cfg: RunConfig, now_floor: pd.Timestamp) -> None:
+def _backfill_spot_ohlcv(cfg: RunConfig, now_floor: pd.Timestamp, con: duckdb.DuckDBPyConnection) -> None:
     """Backfill spot OHLCV klines.
     
     Note: This is OHLCV-like data. We store:
@@ -450,13 +480,13 @@ def _backfill_spot_ohlcv(cfg: RunConfig, now_floor: pd.Timestamp) -> None:
       - snapshot_time = timestamp + 1h (candle close)
     """
     db_path = cfg.get_spot_ohlcv_db()
-    ensure_table_spot_ohlcv(db_path)
+    ensure_table_spot_ohlcv(db_path, con=con)
 
     klines = fetch_spot_klines(DEFAULT_SYMBOL, DEFAULT_INTERVAL, cfg.n_recent)
     api_df = spot_klines_to_dataframe(klines)
     
     # Add snapshot_time = close time (open + 1h for 1h candles)
-    api_df["snapshot_time"] = api_df["timestamp"] + pd.Timedelta(hours=1)
+    api_df["snapshot_time"] = api_df["timestamp"] + _ONE_HOUR
     
     api_df = _filter_closed(api_df, now_floor)
 
@@ -464,27 +494,27 @@ def _backfill_spot_ohlcv(cfg: RunConfig, now_floor: pd.Timestamp) -> None:
         print("[INFO] Spot OHLCV: No closed data returned")
         return
 
-    last_closed_ts = api_df.iloc[-1]["timestamp"]
-    db_tail = read_last_n_spot_ohlcv(db_path, cfg.db_validate_rows, last_closed_ts + pd.Timedelta(hours=1))
+    last_closed_ts = api_df["timestamp"].iloc[-1]
+    db_tail = read_last_n_spot_ohlcv(db_path, cfg.db_validate_rows, last_closed_ts + _ONE_HOUR, con=con)
 
     if not db_tail.empty:
         db_max_ts = db_tail["timestamp"].max()
-        to_append = api_df[api_df["timestamp"] > db_max_ts].copy()
+        to_append = api_df[api_df["timestamp"] > db_max_ts]
     else:
-        to_append = api_df.copy()
+        to_append = api_df
 
     if to_append.empty:
         print("[INFO] Spot OHLCV: No new rows to append")
         return
 
-    appended = 0
-    for _, row in to_append.iterrows():
-        if cfg.dry_run:
-            if cfg.debug:
-                print("[DRY-RUN] Would append spot_ohlcv:", row.to_dict())
-        else:
-            append_spot_ohlcv_if_absent(db_path, row)
-        appended += 1
+    if cfg.dry_run:
+        if cfg.debug:
+            for row in to_append.to_dict("records"):
+                print("[DRY-RUN] Would append spot_ohlcv:", row)
+        appended = len(to_append)
+    else:
+        with transaction(con):
+            appended = append_spot_ohlcv_rows_if_absent(db_path, to_append, con=con)
 
     ts_min = to_append['timestamp'].min()
     ts_max = to_append['timestamp'].max()
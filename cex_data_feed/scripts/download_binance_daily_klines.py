@@ -28,11 +28,15 @@ from __future__ import annotations
 
 import argparse
 import os
-from datetime import datetime, timedelta, timezone
+import shutil
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, datetime, timezone
 from typing import List, Optional, Tuple
-from urllib.error import HTTPError, URLError
 from urllib.parse import urlparse
-from urllib.request import Request, urlopen
+import xml.etree.ElementTree as ET
+
+import requests
+from requests.adapters import HTTPAdapter
 
 
 BASE_URL_TEMPLATE = "https://data.binance.vision/data/{market_path}/daily/klines"
@@ -40,6 +44,13 @@ MARKET_PATHS = {
     "futures": "futures/um",
     "spot": "spot",
 }
+# S3 bucket behind data.binance.vision; its key listing carries every file name and size
+LISTING_URL = "https://s3-ap-northeast-1.amazonaws.com/data.binance.vision"
+_S3_NS = "{http://s3.amazonaws.com/doc/2006-03-01/}"
+PROBE_WORKERS = 16
+DOWNLOAD_WORKERS = 6
+# Copy buffer for streaming archives to disk
+COPY_CHUNK = 8 * 1024 * 1024
 
 USER_AGENT = (
     "Mozilla/5.0 (X11; Linux x86_64) "
@@ -48,9 +59,23 @@ USER_AGENT = (
 )
 
 
-def _http_request(url: str, *, method: str = "GET", timeout: float = 60.0):
-    req = Request(url, method=method, headers={"User-Agent": USER_AGENT})
-    return urlopen(req, timeout=timeout)
+# One keep-alive session for all probes and downloads; the pool covers the probe thread fan-out
+_session = requests.Session()
+_session.headers["User-Agent"] = USER_AGENT
+_adapter = HTTPAdapter(pool_connections=PROBE_WORKERS, pool_maxsize=PROBE_WORKERS)
+_session.mount("https://", _adapter)
+_session.mount("http://", _adapter)
+
+
+def _http_request(url: str, *, method: str = "GET", timeout: float = 60.0) -> requests.Response:
+    """Streamed request on the shared session; raises requests.HTTPError on 4xx/5xx."""
+    resp = _session.request(method, url, timeout=timeout, stream=True, allow_redirects=True)
+    try:
+        resp.raise_for_status()
+    except requests.HTTPError:
+        resp.close()
+        raise
+    return resp
 
 
 def _date_iter(start_date: str, end_date: Optional[str] = None) -> List[str]:
@@ -61,12 +86,8 @@ def _date_iter(start_date: str, end_date: Optional[str] = None) -> List[str]:
         end = datetime.strptime(end_date, "%Y-%m-%d").replace(tzinfo=timezone.utc)
     if end < start:
         return []
-    out = []
-    cur = start
-    while cur <= end:
-        out.append(cur.strftime("%Y-%m-%d"))
-        cur += timedelta(days=1)
-    return out
+    # Walk day ordinals directly instead of stepping a datetime object
+    return [date.fromordinal(o).isoformat() for o in range(start.toordinal(), end.toordinal() + 1)]
 
 
 def build_daily_url(symbol: str, interval: str, yyyymmdd: str, market: str = "futures") -> str:
@@ -81,10 +102,10 @@ def url_exists(url: str, timeout: float = 30.0) -> Tuple[bool, Optional[int]]:
             length = resp.headers.get("Content-Length")
             size = int(length) if length is not None else None
             return True, size
-    except HTTPError as e:
-        if getattr(e, "code", None) == 404:
+    except requests.HTTPError as e:
+        if e.response is not None and e.response.status_code == 404:
             return False, None
-    except URLError:
+    except requests.RequestException:
         pass
     try:
         with _http_request(url, method="GET", timeout=timeout) as resp:
@@ -95,6 +116,67 @@ def url_exists(url: str, timeout: float = 30.0) -> Tuple[bool, Optional[int]]:
         return False, None
 
 
+def probe_urls(
+    urls: List[str], timeout: float = 30.0, workers: int = PROBE_WORKERS
+) -> List[Tuple[str, Optional[int]]]:
+    """Run url_exists over urls concurrently; return (url, size) for those found, in input order.
+
+    Probes are independent HEAD round-trips, so a thread pool overlaps the network wait.
+    """
+    if not urls:
+        return []
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(urls)))) as pool:
+        results = list(pool.map(lambda u: url_exists(u, timeout=timeout), urls))
+    return [(u, size) for u, (ok, size) in zip(urls, results) if ok]
+
+
+def list_remote_sizes(prefix: str, timeout: float = 30.0) -> Optional[dict]:
+    """Return {file_name: size} for all keys under prefix from the bucket listing.
+
+    One (paged) listing request replaces a HEAD per candidate file. Returns None when the
+    listing cannot be fetched or parsed so callers can fall back to probe_urls.
+    """
+    sizes: dict = {}
+    marker = ""
+    try:
+        while True:
+            resp = _session.get(LISTING_URL, params={"prefix": prefix, "marker": marker}, timeout=timeout)
+            resp.raise_for_status()
+            root = ET.fromstring(resp.content)
+            contents = root.findall(f"{_S3_NS}Contents")
+            for item in contents:
+                key = item.findtext(f"{_S3_NS}Key", "")
+                sizes[key.rsplit("/", 1)[-1]] = int(item.findtext(f"{_S3_NS}Size", ""))
+            if root.findtext(f"{_S3_NS}IsTruncated") != "true" or not contents:
+                return sizes
+            marker = root.findtext(f"{_S3_NS}NextMarker") or contents[-1].findtext(f"{_S3_NS}Key", "")
+    except (requests.RequestException, ET.ParseError, ValueError) as e:
+        print(f"[WARN] Bucket listing unavailable ({e}); probing files individually.")
+        return None
+
+
+def find_available(
+    urls: List[str], timeout: float = 30.0, workers: int = PROBE_WORKERS
+) -> List[Tuple[str, Optional[int]]]:
+    """Return (url, size) for the urls that exist, in input order.
+
+    Looks the file names up in one listing of their common directory; falls back to
+    concurrent HEAD probes if the listing is unavailable.
+    """
+    if not urls:
+        return []
+    base_dir = urlparse(urls[0]).path.rsplit("/", 1)[0]
+    listing = list_remote_sizes(base_dir.lstrip("/") + "/", timeout=timeout)
+    if listing is None:
+        return probe_urls(urls, timeout=timeout, workers=workers)
+    found = []
+    for u in urls:
+        size = listing.get(os.path.basename(urlparse(u).path))
+        if size is not None:
+            found.append((u, size))
+    return found
+
+
 def _get_remote_content_length(url: str, timeout: float = 60.0) -> Optional[int]:
     try:
         with _http_request(url, method="HEAD", timeout=timeout) as resp:
@@ -110,27 +192,23 @@ def _stream_download(url: str, dest_path: str, timeout: float = 120.0) -> None:
     tmp_path = dest_path + ".part"
     os.makedirs(os.path.dirname(dest_path), exist_ok=True)
     with _http_request(url, method="GET", timeout=timeout) as resp:
+        resp.raw.decode_content = True
         with open(tmp_path, "wb") as f:
-            while True:
-                chunk = resp.read(1024 * 512)
-                if not chunk:
-                    break
-                f.write(chunk)
+            shutil.copyfileobj(resp.raw, f, COPY_CHUNK)
     os.replace(tmp_path, dest_path)
-    try:
-        if os.path.exists(tmp_path):
-            os.remove(tmp_path)
-    except Exception:
-        pass
 
 
-def download_if_needed(url: str, output_dir: str, timeout: float = 120.0) -> Tuple[str, str]:
+def download_if_needed(
+    url: str, output_dir: str, timeout: float = 120.0, remote_size: Optional[int] = None
+) -> Tuple[str, str]:
     file_name = os.path.basename(urlparse(url).path)
     if not file_name:
         return ("failed", "")
     dest_path = os.path.join(output_dir, file_name)
 
-    remote_size = _get_remote_content_length(url, timeout=timeout)
+    # Reuse the size captured by the existence probe; HEAD again only when it is unknown
+    if remote_size is None:
+        remote_size = _get_remote_content_length(url, timeout=timeout)
     if os.path.exists(dest_path):
         try:
             local_size = os.path.getsize(dest_path)
@@ -141,7 +219,7 @@ def download_if_needed(url: str, output_dir: str, timeout: float = 120.0) -> Tup
     try:
         _stream_download(url, dest_path, timeout=timeout)
         return ("downloaded", dest_path)
-    except (HTTPError, URLError):
+    except requests.RequestException:
         return ("failed", dest_path)
     except Exception:
         return ("failed", dest_path)
@@ -162,6 +240,8 @@ def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
     parser.add_argument("--out", required=True, help="Output directory for daily ZIPs")
     parser.add_argument("--dry-run", action="store_true", help="Only list URLs; do not download")
     parser.add_argument("--timeout", type=float, default=120.0, help="Network timeout per request in seconds")
+    parser.add_argument("--workers", type=int, default=PROBE_WORKERS, help="Concurrent existence probes")
+    parser.add_argument("--download-workers", type=int, default=DOWNLOAD_WORKERS, help="Concurrent ZIP downloads")
     return parser.parse_args(argv)
 
 
@@ -173,11 +253,7 @@ def main(argv: Optional[List[str]] = None) -> int:
         return 2
 
     urls = [build_daily_url(args.symbol, args.interval, d, args.market) for d in days]
-    available = []
-    for u in urls:
-        ok, size = url_exists(u, timeout=args.timeout)
-        if ok:
-            available.append((u, size))
+    available = find_available(urls, timeout=args.timeout, workers=args.workers)
     if not available:
         print("[ERROR] No daily files found for the specified range.")
         return 2
@@ -192,15 +268,21 @@ def main(argv: Optional[List[str]] = None) -> int:
     num_downloaded = 0
     num_skipped = 0
     num_failed = 0
-    for idx, (url, _) in enumerate(available, start=1):
-        print(f"[{idx}/{len(available)}] {os.path.basename(urlparse(url).path)}")
-        status, _ = download_if_needed(url, args.out, timeout=args.timeout)
-        if status == "downloaded":
-            num_downloaded += 1
-        elif status == "skipped":
-            num_skipped += 1
-        else:
-            num_failed += 1
+    # Overlap a few transfers; each file still streams to its own .part and is renamed when complete
+    with ThreadPoolExecutor(max_workers=max(1, args.download_workers)) as pool:
+        futures = {
+            pool.submit(download_if_needed, url, args.out, timeout=args.timeout, remote_size=size): url
+            for url, size in available
+        }
+        for idx, fut in enumerate(as_completed(futures), start=1):
+            status, _ = fut.result()
+            print(f"[{idx}/{len(available)}] {os.path.basename(urlparse(futures[fut]).path)} {status}")
+            if status == "downloaded":
+                num_downloaded += 1
+            elif status == "skipped":
+                num_skipped += 1
+            else:
+                num_failed += 1
     print(f"[INFO] Done. downloaded={num_downloaded}, skipped={num_skipped}, failed={num_failed}")
     return 0 if num_failed == 0 else 1
 
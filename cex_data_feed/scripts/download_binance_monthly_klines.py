@@ -3,7 +3,7 @@
 Simple downloader for Binance monthly klines ZIPs (Spot or USDT-M Futures).
 
 - Constructs monthly URLs by pattern without scraping
-- Verifies existence with a HEAD request (falls back to GET if needed)
+- Looks up existence and sizes in one bucket listing (per-file HEAD, then GET, as fallback)
 - Downloads files into a target directory
 - Skips files that already exist and match the remote Content-Length
 
@@ -27,14 +27,17 @@ from __future__ import annotations
 
 import argparse
 import os
+import shutil
 import sys
-import time
 import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timezone
 from typing import List, Optional, Tuple
-from urllib.error import HTTPError, URLError
 from urllib.parse import urlparse
-from urllib.request import Request, urlopen
+import xml.etree.ElementTree as ET
+
+import requests
+from requests.adapters import HTTPAdapter
 
 
 BASE_URL_TEMPLATE = "https://data.binance.vision/data/{market_path}/monthly/klines"
@@ -42,7 +45,14 @@ MARKET_PATHS = {
     "futures": "futures/um",
     "spot": "spot",
 }
+# S3 bucket behind data.binance.vision; its key listing carries every file name and size
+LISTING_URL = "https://s3-ap-northeast-1.amazonaws.com/data.binance.vision"
+_S3_NS = "{http://s3.amazonaws.com/doc/2006-03-01/}"
 DEFAULT_OUTPUT_DIR = "/Volumes/Extreme SSD/trading_data/cex/ohlvc"
+PROBE_WORKERS = 16
+DOWNLOAD_WORKERS = 6
+# Copy buffer for streaming archives to disk
+COPY_CHUNK = 8 * 1024 * 1024
 
 
 USER_AGENT = (
@@ -52,9 +62,23 @@ USER_AGENT = (
 )
 
 
-def _http_request(url: str, *, method: str = "GET", timeout: float = 60.0):
-    req = Request(url, method=method, headers={"User-Agent": USER_AGENT})
-    return urlopen(req, timeout=timeout)
+# One keep-alive session for all probes and downloads; the pool covers the probe thread fan-out
+_session = requests.Session()
+_session.headers["User-Agent"] = USER_AGENT
+_adapter = HTTPAdapter(pool_connections=PROBE_WORKERS, pool_maxsize=PROBE_WORKERS)
+_session.mount("https://", _adapter)
+_session.mount("http://", _adapter)
+
+
+def _http_request(url: str, *, method: str = "GET", timeout: float = 60.0) -> requests.Response:
+    """Streamed request on the shared session; raises requests.HTTPError on 4xx/5xx."""
+    resp = _session.request(method, url, timeout=timeout, stream=True, allow_redirects=True)
+    try:
+        resp.raise_for_status()
+    except requests.HTTPError:
+        resp.close()
+        raise
+    return resp
 
 
 def _month_iter(start_yyyymm: str, end_yyyymm: Optional[str] = None) -> List[str]:
@@ -71,15 +95,10 @@ def _month_iter(start_yyyymm: str, end_yyyymm: Optional[str] = None) -> List[str
     if end_dt < start_dt:
         return []
 
-    months: List[str] = []
-    y, m = start_dt.year, start_dt.month
-    while (y < end_dt.year) or (y == end_dt.year and m <= end_dt.month):
-        months.append(f"{y:04d}-{m:02d}")
-        m += 1
-        if m > 12:
-            m = 1
-            y += 1
-    return months
+    # Absolute month index (year * 12 + month - 1) turns the range into a plain integer range
+    first = start_dt.year * 12 + start_dt.month - 1
+    last = end_dt.year * 12 + end_dt.month - 1
+    return [f"{i // 12:04d}-{i % 12 + 1:02d}" for i in range(first, last + 1)]
 
 
 def build_monthly_url(symbol: str, interval: str, yyyymm: str, market: str = "futures") -> str:
@@ -101,12 +120,12 @@ def url_exists(url: str, timeout: float = 30.0) -> Tuple[bool, Optional[int]]:
             length = resp.headers.get("Content-Length")
             size = int(length) if length is not None else None
             return True, size
-    except HTTPError as e:
+    except requests.HTTPError as e:
         # 404 -> not found; others may still be retried with GET
-        if getattr(e, "code", None) == 404:
+        if e.response is not None and e.response.status_code == 404:
             return False, None
         # Try GET fallback
-    except URLError:
+    except requests.RequestException:
         pass
 
     # Fallback: small GET attempt
@@ -119,16 +138,77 @@ def url_exists(url: str, timeout: float = 30.0) -> Tuple[bool, Optional[int]]:
         return False, None
 
 
+def probe_urls(
+    urls: List[str], timeout: float = 30.0, workers: int = PROBE_WORKERS
+) -> List[Tuple[str, Optional[int]]]:
+    """Run url_exists over urls concurrently; return (url, size) for those found, in input order.
+
+    Probes are independent HEAD round-trips, so a thread pool overlaps the network wait.
+    """
+    if not urls:
+        return []
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(urls)))) as pool:
+        results = list(pool.map(lambda u: url_exists(u, timeout=timeout), urls))
+    return [(u, size) for u, (ok, size) in zip(urls, results) if ok]
+
+
+def list_remote_sizes(prefix: str, timeout: float = 30.0) -> Optional[dict]:
+    """Return {file_name: size} for all keys under prefix from the bucket listing.
+
+    One (paged) listing request replaces a HEAD per candidate file. Returns None when the
+    listing cannot be fetched or parsed so callers can fall back to probe_urls.
+    """
+    sizes: dict = {}
+    marker = ""
+    try:
+        while True:
+            resp = _session.get(LISTING_URL, params={"prefix": prefix, "marker": marker}, timeout=timeout)
+            resp.raise_for_status()
+            root = ET.fromstring(resp.content)
+            contents = root.findall(f"{_S3_NS}Contents")
+            for item in contents:
+                key = item.findtext(f"{_S3_NS}Key", "")
+                sizes[key.rsplit("/", 1)[-1]] = int(item.findtext(f"{_S3_NS}Size", ""))
+            if root.findtext(f"{_S3_NS}IsTruncated") != "true" or not contents:
+                return sizes
+            marker = root.findtext(f"{_S3_NS}NextMarker") or contents[-1].findtext(f"{_S3_NS}Key", "")
+    except (requests.RequestException, ET.ParseError, ValueError) as e:
+        print(f"[WARN] Bucket listing unavailable ({e}); probing files individually.")
+        return None
+
+
+def find_available(
+    urls: List[str], timeout: float = 30.0, workers: int = PROBE_WORKERS
+) -> List[Tuple[str, Optional[int]]]:
+    """Return (url, size) for the urls that exist, in input order.
+
+    Looks the file names up in one listing of their common directory; falls back to
+    concurrent HEAD probes if the listing is unavailable.
+    """
+    if not urls:
+        return []
+    base_dir = urlparse(urls[0]).path.rsplit("/", 1)[0]
+    listing = list_remote_sizes(base_dir.lstrip("/") + "/", timeout=timeout)
+    if listing is None:
+        return probe_urls(urls, timeout=timeout, workers=workers)
+    found = []
+    for u in urls:
+        size = listing.get(os.path.basename(urlparse(u).path))
+        if size is not None:
+            found.append((u, size))
+    return found
+
+
 def _get_remote_content_length(url: str, timeout: float = 60.0) -> Optional[int]:
     try:
         with _http_request(url, method="HEAD", timeout=timeout) as resp:
             length = resp.headers.get("Content-Length")
             if length is not None:
                 return int(length)
-    except HTTPError as e:
+    except requests.HTTPError as e:
         # Some servers may not support HEAD; ignore
         print(f"[INFO] HEAD failed for {url}: {e}. Will GET instead.")
-    except URLError as e:
+    except requests.RequestException as e:
         print(f"[WARN] HEAD connection error for {url}: {e}")
     except Exception as e:
         print(f"[WARN] HEAD unexpected error for {url}: {e}")
@@ -138,37 +218,31 @@ def _get_remote_content_length(url: str, timeout: float = 60.0) -> Optional[int]
 def _stream_download(url: str, dest_path: str, timeout: float = 120.0) -> None:
     tmp_path = dest_path + ".part"
     os.makedirs(os.path.dirname(dest_path), exist_ok=True)
-    bytes_written = 0
-    start_time = time.time()
+    completed = False
     try:
         with _http_request(url, method="GET", timeout=timeout) as resp:
+            resp.raw.decode_content = True
             with open(tmp_path, "wb") as f:
-                while True:
-                    chunk = resp.read(1024 * 512)
-                    if not chunk:
-                        break
-                    f.write(chunk)
-                    bytes_written += len(chunk)
-                    # Lightweight progress indicator
-                    if bytes_written % (1024 * 1024 * 50) == 0:
-                        elapsed = time.time() - start_time
-                        mb = bytes_written / (1024 * 1024)
-                        print(
-                            f"  downloaded ~{mb:.1f} MiB in {elapsed:.1f}s"
-                        )
+                shutil.copyfileobj(resp.raw, f, COPY_CHUNK)
         os.replace(tmp_path, dest_path)
+        completed = True
     finally:
-        # Clean up partial files on error/interruption
-        try:
-            if os.path.exists(tmp_path):
-                os.remove(tmp_path)
-        except Exception:
-            pass
+        # Clean up partial files on error/interruption (os.replace already consumed it on success)
+        if not completed:
+            try:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+            except Exception:
+                pass
 
 
-def download_if_needed(url: str, output_dir: str, timeout: float = 120.0) -> Tuple[str, str]:
+def download_if_needed(
+    url: str, output_dir: str, timeout: float = 120.0, remote_size: Optional[int] = None
+) -> Tuple[str, str]:
     """Download URL into output_dir if missing or size mismatch.
 
+    remote_size: Content-Length already known from url_exists, if any.
+
     Returns a tuple of (status, path):
       - status in {"skipped", "downloaded", "failed"}
       - path is the local file path
@@ -178,7 +252,9 @@ def download_if_needed(url: str, output_dir: str, timeout: float = 120.0) -> Tup
         return ("failed", "")
     dest_path = os.path.join(output_dir, file_name)
 
-    remote_size = _get_remote_content_length(url, timeout=timeout)
+    # Reuse the size captured by the existence probe; HEAD again only when it is unknown
+    if remote_size is None:
+        remote_size = _get_remote_content_length(url, timeout=timeout)
     if os.path.exists(dest_path):
         try:
             local_size = os.path.getsize(dest_path)
@@ -202,7 +278,7 @@ def download_if_needed(url: str, output_dir: str, timeout: float = 120.0) -> Tup
             except OSError:
                 pass
         return ("downloaded", dest_path)
-    except (HTTPError, URLError) as e:
+    except requests.RequestException as e:
         print(f"[ERROR] Download failed for {url}: {e}")
         return ("failed", dest_path)
     except Exception as e:
@@ -243,6 +319,18 @@ def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
         default=120.0,
         help="Network timeout per request in seconds (default: 120).",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=PROBE_WORKERS,
+        help=f"Concurrent existence probes (default: {PROBE_WORKERS}).",
+    )
+    parser.add_argument(
+        "--download-workers",
+        type=int,
+        default=DOWNLOAD_WORKERS,
+        help=f"Concurrent ZIP downloads (default: {DOWNLOAD_WORKERS}).",
+    )
     return parser.parse_args(argv)
 
 
@@ -256,12 +344,8 @@ def main(argv: Optional[List[str]] = None) -> int:
 
     # Build URLs and filter to those that exist
     candidates = [build_monthly_url(args.symbol, args.interval, m, args.market) for m in months]
-    existing: List[Tuple[str, Optional[int]]] = []
     print("[INFO] Probing monthly files...")
-    for url in candidates:
-        ok, size = url_exists(url, timeout=args.timeout)
-        if ok:
-            existing.append((url, size))
+    existing = find_available(candidates, timeout=args.timeout, workers=args.workers)
 
     if not existing:
         print("[ERROR] No files found for the specified range.")
@@ -281,16 +365,22 @@ def main(argv: Optional[List[str]] = None) -> int:
     num_downloaded = 0
     num_skipped = 0
     num_failed = 0
-    for idx, (url, _) in enumerate(existing, start=1):
-        file_name = os.path.basename(urlparse(url).path)
-        print(f"[{idx}/{len(existing)}] {file_name}")
-        status, _ = download_if_needed(url, args.out, timeout=args.timeout)
-        if status == "downloaded":
-            num_downloaded += 1
-        elif status == "skipped":
-            num_skipped += 1
-        else:
-            num_failed += 1
+    # Overlap a few transfers; each file still streams to its own .part and is renamed when complete
+    with ThreadPoolExecutor(max_workers=max(1, args.download_workers)) as pool:
+        futures = {
+            pool.submit(download_if_needed, url, args.out, timeout=args.timeout, remote_size=size): url
+            for url, size in existing
+        }
+        for idx, fut in enumerate(as_completed(futures), start=1):
+            file_name = os.path.basename(urlparse(futures[fut]).path)
+            status, _ = fut.result()
+            print(f"[{idx}/{len(existing)}] {file_name} {status}")
+            if status == "downloaded":
+                num_downloaded += 1
+            elif status == "skipped":
+                num_skipped += 1
+            else:
+                num_failed += 1
 
     print(
         "[INFO] Done. "
@@ -19,19 +19,22 @@ import argparse
 from pathlib import Path
 import sys
 
-import pandas as pd
+import duckdb  # type: ignore
+
+
+EXPORT_COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
 
 
 def _proj_root() -> Path:
     return Path(__file__).resolve().parents[1]
 
 
+def _quote_ident(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
 def main() -> None:
     root = _proj_root()
-    if str(root) not in sys.path:
-        sys.path.insert(0, str(root))
-
-    from run.data_loader import load_ohlcv_duckdb
 
     parser = argparse.ArgumentParser(description='Export OHLCV from DuckDB to CSV')
     parser.add_argument('--duckdb', required=True, help='Path to DuckDB file')
@@ -46,24 +49,31 @@ def main() -> None:
         print(f"ERROR: Output exists: {out_path}. Pass --overwrite to replace.")
         sys.exit(2)
 
-    df = load_ohlcv_duckdb(args.duckdb, table=args.table)
-    if df.empty:
-        print("WARN: No rows fetched from DuckDB; writing empty CSV with header.")
-    # Ensure column order
-    cols = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
-    for c in cols:
-        if c not in df.columns:
-            raise RuntimeError(f"Missing expected column in OHLCV: {c}")
-    df = df[cols].copy()
-
-    df.to_csv(out_path, index=False)
-    if not df.empty:
-        print(f"Wrote {len(df):,} rows to {out_path}")
-        print(f"Range: {df['timestamp'].iloc[0]} .. {df['timestamp'].iloc[-1]}")
+    con = duckdb.connect(args.duckdb, read_only=True)
+    try:
+        table = _quote_ident(args.table)
+        have = {r[0] for r in con.execute(f"DESCRIBE {table}").fetchall()}
+        for c in EXPORT_COLUMNS:
+            if c not in have:
+                raise RuntimeError(f"Missing expected column in OHLCV: {c}")
+
+        # DuckDB writes the CSV itself (parallel, no Python row objects); COPY takes no bind params
+        target = str(out_path).replace("'", "''")
+        con.execute(
+            f"COPY (SELECT {', '.join(EXPORT_COLUMNS)} FROM {table} ORDER BY timestamp) "
+            f"TO '{target}' (FORMAT CSV, HEADER)"
+        )
+        n, ts_min, ts_max = con.execute(f"SELECT COUNT(*), MIN(timestamp), MAX(timestamp) FROM {table}").fetchone()
+    finally:
+        con.close()
+
+    if n:
+        print(f"Wrote {n:,} rows to {out_path}")
+        print(f"Range: {ts_min} .. {ts_max}")
     else:
+        print("WARN: No rows fetched from DuckDB; writing empty CSV with header.")
         print(f"Wrote empty CSV to {out_path}")
 
 
 if __name__ == '__main__':
     main()
-
@@ -29,12 +29,12 @@ Notes:
 from __future__ import annotations
 
 import argparse
-import glob
-import io
 import os
 import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timezone
-from typing import Iterable, List, Optional
+from typing import Iterator, List, Optional
 
 
 DEFAULT_INPUT_DIR = "/Volumes/Extreme SSD/trading_data/cex/ohlvc"
@@ -66,6 +66,11 @@ TS_MAX_MS = 1893456000000
 # Microseconds (16 digits) are > 10^15, milliseconds (13 digits) are < 10^14
 MICROSECOND_THRESHOLD = 10**15
 
+UTF8_BOM = b"\xef\xbb\xbf"
+
+# Output buffer size; small daily chunks coalesce into large sequential writes
+OUTPUT_BUFFER = 1 << 20
+
 
 def normalize_timestamp(ts_str: str, market: str) -> tuple[int, bool]:
     """
@@ -137,29 +142,95 @@ def process_line(line: str, market: str) -> tuple[str, bool]:
     return ",".join(parts), had_microseconds
 
 
-def is_header_line(line: str) -> bool:
-    """Check if line is a header (contains alphabetic chars in first field)."""
-    s = line.strip().lower()
-    if not s:
-        return False
-    if s.startswith("open_time,"):
-        return True
-    # If any alpha character exists in first field, assume header
-    return any(c.isalpha() for c in s.split(",", 1)[0])
+def is_header_line(data: bytes) -> bool:
+    """Check if raw CSV data starts with a header: kline rows start with a digit (open_time), headers do not.
+
+    Only the first byte is inspected, so the whole entry can be passed without slicing out its first line.
+    """
+    return len(data) > 0 and not 0x30 <= data[0] <= 0x39
 
 
-def iter_zip_csv_lines(zip_path: str) -> Iterable[str]:
-    """Yield lines from the first CSV found in the ZIP."""
+def iter_zip_csv_lines(zip_path: str) -> Iterator[str]:
+    """Yield data lines from the first CSV found in the ZIP.
+
+    The entry is inflated and decoded in one call each rather than through a
+    line-buffered text wrapper; only the split into lines is per row. Binance puts
+    a header (when present) only on the first line, so it is tested once on the
+    raw bytes and dropped before decoding.
+    """
     with zipfile.ZipFile(zip_path, "r") as zf:
         names = [n for n in zf.namelist() if n.lower().endswith(".csv")]
         if not names:
             return
-        name = names[0]
-        with zf.open(name, "r") as f:
-            wrapper = io.TextIOWrapper(f, encoding="utf-8-sig", newline="")
-            for line in wrapper:
-                if line and line.strip():
-                    yield line.rstrip("\n\r")
+        data = zf.read(names[0])
+    if data.startswith(UTF8_BOM):
+        data = data[len(UTF8_BOM):]
+    if is_header_line(data):
+        nl = data.find(b"\n")
+        data = data[nl + 1:] if nl >= 0 else b""
+    for line in data.decode("utf-8").splitlines():
+        if line.strip():
+            yield line
+
+
+def merge_zip(zip_path: str, market: str) -> tuple[bytes, int, int]:
+    """Convert one kline ZIP into merged-CSV bytes.
+
+    Returns (chunk, rows, microsecond_rows); chunk is the encoded output for all
+    data rows of the file, ready to be written with a single call.
+    """
+    out: List[str] = []
+    microsecond_rows = 0
+    for line in iter_zip_csv_lines(zip_path):
+        processed_line, had_microseconds = process_line(line, market)
+        out.append(processed_line)
+        if had_microseconds:
+            microsecond_rows += 1
+    if not out:
+        return b"", 0, 0
+    out.append("")
+    return "\n".join(out).encode("utf-8"), len(out) - 1, microsecond_rows
+
+
+def iter_merged_zips(
+    zip_paths: List[str], market: str, workers: int
+) -> Iterator[tuple[str, bytes, int, int]]:
+    """Yield (zip_path, chunk, rows, microsecond_rows) for each ZIP, in input order.
+
+    Inflate + row conversion is CPU-bound and independent per file, so files are
+    converted in worker processes. At most 2 * workers results are in flight, which
+    bounds memory while keeping every worker busy.
+    """
+    if workers <= 1:
+        for zp in zip_paths:
+            yield (zp, *merge_zip(zp, market))
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending: deque = deque()
+        for zp in zip_paths:
+            pending.append((zp, pool.submit(merge_zip, zp, market)))
+            if len(pending) >= 2 * workers:
+                done_zp, fut = pending.popleft()
+                yield (done_zp, *fut.result())
+        while pending:
+            done_zp, fut = pending.popleft()
+            yield (done_zp, *fut.result())
+
+
+def list_kline_zips(in_dir: str, symbol: str, interval: str) -> List[str]:
+    """Return {SYMBOL}-{INTERVAL}-*.zip paths in in_dir, oldest first.
+
+    One scandir pass with a prefix/suffix test; the YYYY-MM[-DD] suffix makes
+    name order chronological.
+    """
+    prefix = f"{symbol}-{interval}-"
+    try:
+        with os.scandir(in_dir) as it:
+            entries = [e for e in it if e.name.startswith(prefix) and e.name.endswith(".zip")]
+    except FileNotFoundError:
+        return []
+    entries.sort(key=lambda e: e.name)
+    return [e.path for e in entries]
 
 
 def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
@@ -186,6 +257,12 @@ def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
     p.add_argument(
         "--overwrite", action="store_true", help="Overwrite output if it exists"
     )
+    p.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes for unzip/convert (default: CPU count, capped at number of ZIPs)",
+    )
     return p.parse_args(argv)
 
 
@@ -193,7 +270,7 @@ def main(argv: Optional[List[str]] = None) -> int:
     args = parse_args(argv)
 
     pattern = os.path.join(args.in_dir, f"{args.symbol}-{args.interval}-*.zip")
-    zip_paths = sorted(glob.glob(pattern))
+    zip_paths = list_kline_zips(args.in_dir, args.symbol, args.interval)
     if not zip_paths:
         print(f"[ERROR] No ZIPs found matching: {pattern}")
         return 2
@@ -219,23 +296,19 @@ def main(argv: Optional[List[str]] = None) -> int:
     total_rows = 0
     microsecond_rows = 0
     
-    with open(out_path, "w", encoding="utf-8", newline="\n") as out_f:
+    with open(out_path, "wb", buffering=OUTPUT_BUFFER) as out_f:
         if not args.no_header:
-            out_f.write(",".join(BINANCE_KLINE_HEADER) + "\n")
+            out_f.write((",".join(BINANCE_KLINE_HEADER) + "\n").encode("utf-8"))
 
-        for idx, zp in enumerate(zip_paths, start=1):
+        workers = args.workers or min(os.cpu_count() or 1, len(zip_paths))
+        merged = iter_merged_zips(zip_paths, args.market, workers)
+        for idx, (zp, chunk, rows, micro_rows) in enumerate(merged, start=1):
             base = os.path.basename(zp)
             print(f"[{idx}/{len(zip_paths)}] Merging {base}")
-            
-            for line in iter_zip_csv_lines(zp):
-                if is_header_line(line):
-                    continue
-                
-                processed_line, had_microseconds = process_line(line, args.market)
-                out_f.write(processed_line + "\n")
-                total_rows += 1
-                if had_microseconds:
-                    microsecond_rows += 1
+
+            out_f.write(chunk)
+            total_rows += rows
+            microsecond_rows += micro_rows
 
     print(f"\n[INFO] Merge complete!")
     print(f"  - Output: {out_path}")
@@ -4,6 +4,7 @@ from __future__ import annotations
 from pathlib import Path
 import sys
 
+import numpy as np
 import pandas as pd
 
 
@@ -16,7 +17,8 @@ def main() -> None:
     if str(root) not in sys.path:
         sys.path.append(str(root))
 
-    from feed_binance_btcusdt_perp.api import Kline, klines_to_dataframe, compute_target_hour
+    import feed_binance_btcusdt_perp.api as api
+    from feed_binance_btcusdt_perp.api import Kline, klines_to_dataframe, kline_arrays_to_dataframe, compute_target_hour
 
     # Build out-of-order klines and ensure sorting + parsing
     def make_k(open_hour: str, open_val: str) -> Kline:
@@ -34,6 +36,33 @@ def main() -> None:
     ]
     assert df['open'].iloc[0] == 101.0 and df['open'].iloc[-1] == 103.0
     assert {'timestamp', 'open', 'high', 'low', 'close', 'volume'}.issubset(set(df.columns))
+    assert '_open_time_ms' not in df.columns
+
+    # Raw API payload (numbers as strings, trailing ignore field) straight into typed arrays
+    payload = [
+        [1704070800000, "101.5", "102.0", "101.0", "101.8", "12.5", 1704074399999, "1272.5", 42, "6.25", "636.25", "0"],
+        [1704067200000, "100.0", "101.0", "99.5", "100.5", "10.0", 1704070799999, "1005.0", 40, "5.0", "502.5", "0"],
+    ]
+    orig_get_json = api._get_json
+    api._get_json = lambda url: payload
+    try:
+        arrays = api.fetch_klines_as_arrays('BTCUSDT', '1h', 2)
+    finally:
+        api._get_json = orig_get_json
+    assert set(arrays) == set(api.KLINE_ARRAY_FIELDS)
+    for name in ('open_time_ms', 'close_time_ms', 'num_trades'):
+        assert arrays[name].dtype == np.int64, (name, arrays[name].dtype)
+    np.testing.assert_array_equal(arrays['open_time_ms'], [1704070800000, 1704067200000])
+    np.testing.assert_array_equal(arrays['num_trades'], [42, 40])
+    assert arrays['open'].dtype == np.float64
+    np.testing.assert_array_equal(arrays['open'], [101.5, 100.0])
+    np.testing.assert_array_equal(arrays['taker_buy_quote_volume'], [636.25, 502.5])
+
+    # Frame from the arrays is sorted and keeps the raw open time
+    df2 = kline_arrays_to_dataframe(arrays)
+    assert list(df2['timestamp'].astype(str)) == ['2024-01-01 00:00:00', '2024-01-01 01:00:00']
+    assert df2['_open_time_ms'].tolist() == [1704067200000, 1704070800000]
+    assert df2['close'].tolist() == [100.5, 101.8]
 
     # Compute target hour from a fixed now
     now_floor, target = compute_target_hour(pd.Timestamp('2024-01-15 14:23:45+00:00').to_pydatetime())
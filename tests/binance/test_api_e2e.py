@@ -16,8 +16,9 @@ def _proj_root() -> Path:
 
 
 def _assert_hourly(df: pd.DataFrame) -> None:
-    ts = df["timestamp"].sort_values().reset_index(drop=True)
-    diffs = ts.diff().dropna().dt.total_seconds().values
+    secs = df["timestamp"].to_numpy(dtype="datetime64[s]").astype("int64")
+    secs.sort()
+    diffs = np.diff(secs)
     assert (diffs == 3600).all(), f"non-hourly spacing detected: {diffs}"
 
 
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+from pathlib import Path
+import shutil
+import sys
+import zipfile
+
+
+def _proj_root() -> Path:
+    return Path(__file__).resolve().parents[2]
+
+
+def main() -> None:
+    root = _proj_root()
+    if str(root) not in sys.path:
+        sys.path.append(str(root))
+
+    from cex_data_feed.scripts.backfill_1m import _merge_zips
+    from cex_data_feed.scripts.merge_binance_klines import BINANCE_KLINE_HEADER
+
+    tmp_dir = root / '.tmp' / 'feed_tests' / 'backfill_1m'
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+
+    # One daily ZIP with a header line and two 1m klines
+    rows = [
+        '1704067200000,100.0,101.0,99.0,100.5,10.0,1704067259999,1005.0,5,4.0,402.0,0',
+        '1704067260000,100.5,102.0,100.0,101.5,12.0,1704067319999,1218.0,6,5.0,507.5,0',
+    ]
+    header = 'open_time,open,high,low,close,volume,close_time,quote_volume,count,taker_buy_volume,taker_buy_quote_volume,ignore'
+    with zipfile.ZipFile(tmp_dir / 'BTCUSDT-1m-2024-01-01.zip', 'w') as zf:
+        zf.writestr('BTCUSDT-1m-2024-01-01.csv', '\n'.join([header] + rows) + '\n')
+
+    out_csv = tmp_dir / 'merged.csv'
+    n = _merge_zips('BTCUSDT', str(tmp_dir), str(out_csv), dry_run=False, debug=False)
+    assert n == 2, n
+
+    lines = out_csv.read_text(encoding='utf-8').splitlines()
+    assert lines[0] == ','.join(BINANCE_KLINE_HEADER)
+    assert lines[1:] == [
+        rows[0] + ',2024-01-01 00:00:00',
+        rows[1] + ',2024-01-01 00:01:00',
+    ], lines
+
+    print('backfill_1m merge tests OK')
+
+
+if __name__ == '__main__':
+    main()
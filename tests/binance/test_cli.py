@@ -4,9 +4,20 @@ from __future__ import annotations
 from pathlib import Path
 import sys
 
+import numpy as np
 import pandas as pd
 
 
+# Stubbed bars as (open hour, open price)
+BARS = [
+    ('2024-01-01 08:00:00', 100.0),
+    ('2024-01-01 09:00:00', 110.0),
+    ('2024-01-01 10:00:00', 120.0),
+]
+# Epoch ms of each bar hour, derived from BARS once at import
+HOURS_MS = {h: int(np.datetime64(h, 'ms').astype(np.int64)) for h, _ in BARS}
+
+
 def _proj_root() -> Path:
     return Path(__file__).resolve().parents[2]
 
@@ -25,20 +36,16 @@ def main() -> None:
     target = pd.Timestamp('2024-01-01 10:00:00')
     cli_mod.compute_target_hour = lambda: (now_floor, target)  # type: ignore
 
-    # Stub fetch_klines to avoid network and to match target hour
-    def make_k(ts: pd.Timestamp, open_val: float) -> api_mod.Kline:
-        ot = int(ts.tz_localize('UTC').timestamp() * 1000)
+    # Stub the kline fetch to avoid network and to match target hour
+    def make_k(hour_iso: str, open_val: float) -> api_mod.Kline:
+        ot = HOURS_MS[hour_iso]
         ct = ot + 3600_000 - 1  # closed before now_floor
         return api_mod.Kline(open_time_ms=ot, open=f"{open_val}", high=f"{open_val+2}", low=f"{open_val-2}", close=f"{open_val+1}", volume="10.0", close_time_ms=ct)
 
     def fake_fetch(symbol: str, interval: str, limit: int):
-        return [
-            make_k(pd.Timestamp('2024-01-01 08:00:00'), 100.0),
-            make_k(pd.Timestamp('2024-01-01 09:00:00'), 110.0),
-            make_k(pd.Timestamp('2024-01-01 10:00:00'), 120.0),
-        ]
+        return [make_k(h, o) for h, o in BARS]
 
-    cli_mod.fetch_klines = fake_fetch  # type: ignore
+    cli_mod.fetch_klines_as_arrays = lambda *a: api_mod.klines_to_arrays(fake_fetch(*a))  # type: ignore
 
     tmp_root = root / '.tmp' / 'feed_tests' / 'cli'
     tmp_root.mkdir(parents=True, exist_ok=True)
@@ -54,6 +61,18 @@ def main() -> None:
     files = list((persist_dir / 'cli_dataset').glob('*_api_pull.csv'))
     assert files, 'raw snapshot not written'
 
+    # Seed history [08, 09] and run for real: the DB-side validation must pass and append t
+    from feed_binance_btcusdt_perp.db import ensure_table, append_row_if_absent, coverage_stats
+    if db_path.exists():
+        db_path.unlink()
+    ensure_table(db_path)
+    for ts, o in [('2024-01-01 08:00:00', 100.0), ('2024-01-01 09:00:00', 110.0)]:
+        t = pd.Timestamp(ts)
+        append_row_if_absent(db_path, pd.Series({'timestamp': t, 'snapshot_time': t + pd.Timedelta(hours=1), 'open': o, 'high': o+2, 'low': o-2, 'close': o+1, 'volume': 10.0}))
+    rc = RunConfig(n_recent=3, duckdb_path=db_path, persist_dir=persist_dir, dataset_slug='cli_dataset')
+    assert run_once(rc) == 0
+    assert coverage_stats(db_path)[2] == 3
+
     print('cli tests OK')
 
 
@@ -4,9 +4,21 @@ from __future__ import annotations
 from pathlib import Path
 import sys
 
+import numpy as np
 import pandas as pd
 
 
+# Stubbed bars as (open hour, open price)
+BARS = [
+    ('2024-01-01 08:00:00', 100.0),
+    ('2024-01-01 09:00:00', 110.0),
+    ('2024-01-01 10:00:00', 120.0),
+    ('2024-01-01 11:00:00', 130.0),
+]
+# Epoch ms of each bar hour, derived from BARS once at import
+HOURS_MS = {h: int(np.datetime64(h, 'ms').astype(np.int64)) for h, _ in BARS}
+
+
 def _proj_root() -> Path:
     return Path(__file__).resolve().parents[2]
 
@@ -18,28 +30,23 @@ def main() -> None:
 
     from feed_binance_btcusdt_perp import api as api_mod
     import feed_binance_btcusdt_perp.cli as cli_mod
-    from feed_binance_btcusdt_perp.db import ensure_table, append_row_if_absent, coverage_stats
+    from feed_binance_btcusdt_perp.db import ensure_table, append_rows_if_absent, coverage_stats
 
     # Fix the target hour context
     now_floor = pd.Timestamp('2024-01-01 12:00:00')
     target = pd.Timestamp('2024-01-01 11:00:00')
     cli_mod.compute_target_hour = lambda: (now_floor, target)  # type: ignore
 
-    # Stub fetch_klines to produce 08:00, 09:00, 10:00, 11:00
-    def make_k(ts: pd.Timestamp, open_val: float) -> api_mod.Kline:
-        ot = int(ts.tz_localize('UTC').timestamp() * 1000)
+    # Stub the kline fetch to produce 08:00, 09:00, 10:00, 11:00
+    def make_k(hour_iso: str, open_val: float) -> api_mod.Kline:
+        ot = HOURS_MS[hour_iso]
         ct = ot + 3600_000 - 1
         return api_mod.Kline(open_time_ms=ot, open=f"{open_val}", high=f"{open_val+2}", low=f"{open_val-2}", close=f"{open_val+1}", volume="10.0", close_time_ms=ct)
 
     def fake_fetch(symbol: str, interval: str, limit: int):
-        return [
-            make_k(pd.Timestamp('2024-01-01 08:00:00'), 100.0),
-            make_k(pd.Timestamp('2024-01-01 09:00:00'), 110.0),
-            make_k(pd.Timestamp('2024-01-01 10:00:00'), 120.0),
-            make_k(pd.Timestamp('2024-01-01 11:00:00'), 130.0),
-        ]
+        return [make_k(h, o) for h, o in BARS]
 
-    cli_mod.fetch_klines = fake_fetch  # type: ignore
+    cli_mod.fetch_klines_as_arrays = lambda *a: api_mod.klines_to_arrays(fake_fetch(*a))  # type: ignore
 
     # Temp DB and artifacts
     tmp_root = root / '.tmp' / 'feed_tests' / 'cli_catchup'
@@ -47,12 +54,23 @@ def main() -> None:
     db_path = tmp_root / 'ohlcv.duckdb'
     persist_dir = tmp_root / 'artifacts'
 
-    # Seed DB with 08:00 and 09:00 only
+    if db_path.exists():
+        db_path.unlink()
+
+    # Seed DB with 08:00 and 09:00 only, in one batch insert
     ensure_table(db_path)
-    def row(ts, o):
-        return pd.Series({'timestamp': pd.Timestamp(ts), 'open': o, 'high': o+2, 'low': o-2, 'close': o+1, 'volume': 10.0})
-    append_row_if_absent(db_path, row('2024-01-01 08:00:00', 100.0))
-    append_row_if_absent(db_path, row('2024-01-01 09:00:00', 110.0))
+    seed_ts = pd.to_datetime(['2024-01-01 08:00:00', '2024-01-01 09:00:00'])
+    seed_open = np.array([100.0, 110.0])
+    seed = pd.DataFrame({
+        'timestamp': seed_ts,
+        'snapshot_time': seed_ts + pd.Timedelta(hours=1),
+        'open': seed_open,
+        'high': seed_open + 2,
+        'low': seed_open - 2,
+        'close': seed_open + 1,
+        'volume': 10.0,
+    })
+    assert append_rows_if_absent(db_path, seed) == 2
 
     # Run catch-up (dry-run False so it writes to DB)
     rc = cli_mod.RunConfig(n_recent=4, duckdb_path=db_path, persist_dir=persist_dir, dataset_slug='cli_dataset', dry_run=False, debug=True, catch_up=True)
@@ -26,6 +26,13 @@ import duckdb  # type: ignore
 import numpy as np
 import pandas as pd
 
+try:  # pyarrow tokenizes and converts the CSV on multiple threads; pandas' C parser is the fallback
+    import pyarrow as pa  # type: ignore
+    import pyarrow.csv as pacsv  # type: ignore
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+    pacsv = None
+
 
 def _proj_root() -> Path:
     return Path(__file__).resolve().parents[2]
@@ -34,21 +41,40 @@ def _proj_root() -> Path:
 def _read_csv_ohlcv(path: Path) -> pd.DataFrame:
     if not path.exists():
         raise FileNotFoundError(f"CSV not found: {path}")
-    df = pd.read_csv(path)
+    need = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+    if pacsv is not None:
+        # Resolve column names from the header line so pyarrow only converts the needed columns
+        with open(path, encoding='utf-8-sig') as f:
+            names = f.readline().rstrip('\r\n').split(',')
+        if 'timestamp' not in names:
+            names[0] = 'timestamp'
+        names = [str(c).strip().lower() for c in names]
+        missing = [c for c in need if c not in names]
+        if missing:
+            raise ValueError(f"CSV missing required columns: {missing}")
+        table = pacsv.read_csv(
+            path,
+            read_options=pacsv.ReadOptions(column_names=names, skip_rows=1, block_size=16 << 20),
+            convert_options=pacsv.ConvertOptions(
+                include_columns=need,
+                column_types={c: pa.float64() for c in need[1:]},
+            ),
+        )
+        df = table.to_pandas()
+    else:
+        df = pd.read_csv(path)
+        if 'timestamp' not in df.columns:
+            first = df.columns[0]
+            df = df.rename(columns={first: 'timestamp'})
+        # Standardize column names
+        df.columns = [str(c).strip().lower() for c in df.columns]
+        missing = [c for c in need if c not in df.columns]
+        if missing:
+            raise ValueError(f"CSV missing required columns: {missing}")
+        df = df[need]
     # Normalize timestamp to UTC-naive
-    if 'timestamp' not in df.columns:
-        first = df.columns[0]
-        df = df.rename(columns={first: 'timestamp'})
     ts = pd.to_datetime(df['timestamp'], errors='coerce', utc=True)
     df['timestamp'] = ts.dt.tz_convert('UTC').dt.tz_localize(None)
-    # Standardize column names
-    df.columns = [str(c).strip().lower() for c in df.columns]
-    # Keep only needed columns
-    need = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
-    missing = [c for c in need if c not in df.columns]
-    if missing:
-        raise ValueError(f"CSV missing required columns: {missing}")
-    df = df[need].copy()
     # Deduplicate and sort
     df = df.dropna(subset=['timestamp'])
     df = df[~df['timestamp'].duplicated(keep='last')]
@@ -85,7 +111,8 @@ def main() -> None:
         print('[ERROR] CSV has no rows')
         return
     idxs = rng.choice(len(csv_df), size=min(n, len(csv_df)), replace=False)
-    sampled = csv_df.iloc[sorted(idxs.tolist())].copy()
+    idxs.sort()
+    sampled = csv_df.iloc[idxs].copy()
 
     db_path = Path(args.duckdb)
     if not db_path.exists():
@@ -96,59 +123,75 @@ def main() -> None:
     print(f"DuckDB: {db_path}  Table: {args.table}")
     print(f"Sampling {len(sampled)} timestamp(s) with seed={args.seed}")
 
+    cols = ['open', 'high', 'low', 'close', 'volume']
     con = duckdb.connect(str(db_path))
     try:
         con.execute("SET TimeZone='UTC';")
-        for _, row in sampled.iterrows():
-            ts = pd.Timestamp(row['timestamp'])
-            q = f"SELECT timestamp, open, high, low, close, volume FROM {args.table} WHERE timestamp = ?"
-            try:
-                df_db = con.execute(q, [ts.to_pydatetime()]).fetch_df()
-            except Exception as e:
-                print(f"{ts}: DB query error: {e}")
-                continue
-            if df_db.empty:
-                print(f"==== {ts} ====")
-                print("DB : NOT FOUND")
-                print(
-                    "CSV:",
-                    f"open={row['open']:.8f}",
-                    f"high={row['high']:.8f}",
-                    f"low={row['low']:.8f}",
-                    f"close={row['close']:.8f}",
-                    f"volume={row['volume']:.6f}",
-                )
-                continue
-            db_row = df_db.iloc[0][['open','high','low','close','volume']].astype(float)
-            csv_row = row[['open','high','low','close','volume']].astype(float)
-            diffs = (db_row - csv_row).abs()
-            print(f"==== {ts} ====")
-            print(
-                "DB :",
-                f"open={db_row['open']:.8f}",
-                f"high={db_row['high']:.8f}",
-                f"low={db_row['low']:.8f}",
-                f"close={db_row['close']:.8f}",
-                f"volume={db_row['volume']:.6f}",
-            )
+        # One join against the sampled timestamps instead of a point query per sample
+        con.register('picks', sampled[['timestamp']])
+        q = f"""
+            SELECT d.timestamp, d.open, d.high, d.low, d.close, d.volume
+            FROM {args.table} d
+            JOIN picks p ON d.timestamp = p.timestamp
+        """
+        try:
+            db_df = con.execute(q).fetch_df()
+        except Exception as e:
+            print(f"DB query error: {e}")
+            return
+        finally:
+            con.unregister('picks')
+    finally:
+        con.close()
+
+    db_df['timestamp'] = db_df['timestamp'].astype(sampled['timestamp'].dtype)
+    merged = sampled.merge(db_df, on='timestamp', how='left', suffixes=('', '_db'), indicator=True)
+    # All DB-vs-CSV differences in one array expression; NOT FOUND rows just carry NaN
+    csv_arr = merged[cols].to_numpy(dtype=np.float64)
+    db_arr = merged[[f"{c}_db" for c in cols]].to_numpy(dtype=np.float64)
+    diff_arr = np.abs(db_arr - csv_arr)
+    found = (merged['_merge'] == 'both').to_numpy()
+    for i, ts in enumerate(merged['timestamp']):
+        ts = pd.Timestamp(ts)
+        c_open, c_high, c_low, c_close, c_vol = csv_arr[i]
+        print(f"==== {ts} ====")
+        if not found[i]:
+            print("DB : NOT FOUND")
             print(
                 "CSV:",
-                f"open={csv_row['open']:.8f}",
-                f"high={csv_row['high']:.8f}",
-                f"low={csv_row['low']:.8f}",
-                f"close={csv_row['close']:.8f}",
-                f"volume={csv_row['volume']:.6f}",
-            )
-            print(
-                "DIFF:",
-                f"open={diffs['open']:.10f}",
-                f"high={diffs['high']:.10f}",
-                f"low={diffs['low']:.10f}",
-                f"close={diffs['close']:.10f}",
-                f"volume={diffs['volume']:.10f}",
+                f"open={c_open:.8f}",
+                f"high={c_high:.8f}",
+                f"low={c_low:.8f}",
+                f"close={c_close:.8f}",
+                f"volume={c_vol:.6f}",
             )
-    finally:
-        con.close()
+            continue
+        d_open, d_high, d_low, d_close, d_vol = db_arr[i]
+        x_open, x_high, x_low, x_close, x_vol = diff_arr[i]
+        print(
+            "DB :",
+            f"open={d_open:.8f}",
+            f"high={d_high:.8f}",
+            f"low={d_low:.8f}",
+            f"close={d_close:.8f}",
+            f"volume={d_vol:.6f}",
+        )
+        print(
+            "CSV:",
+            f"open={c_open:.8f}",
+            f"high={c_high:.8f}",
+            f"low={c_low:.8f}",
+            f"close={c_close:.8f}",
+            f"volume={c_vol:.6f}",
+        )
+        print(
+            "DIFF:",
+            f"open={x_open:.10f}",
+            f"high={x_high:.10f}",
+            f"low={x_low:.10f}",
+            f"close={x_close:.10f}",
+            f"volume={x_vol:.10f}",
+        )
 
     print('compare_api_vs_csv OK')
 
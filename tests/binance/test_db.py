@@ -16,41 +16,64 @@ def main() -> None:
     if str(root) not in sys.path:
         sys.path.append(str(root))
 
-    from feed_binance_btcusdt_perp.db import ensure_table, append_row_if_absent, read_last_n_rows_ending_before, TABLE_NAME
-    import duckdb  # type: ignore
+    from feed_binance_btcusdt_perp.db import ensure_table, append_row_if_absent, append_rows_if_absent, read_last_n_rows_ending_before, read_overlap_bundle, connect, transaction, TABLE_NAME
 
     tmp_db = root / '.tmp' / 'feed_tests' / 'ohlcv_test.duckdb'
     tmp_db.parent.mkdir(parents=True, exist_ok=True)
     if tmp_db.exists():
         tmp_db.unlink()
 
-    ensure_table(tmp_db)
-
     # Prepare timestamps
     t8 = pd.Timestamp('2024-01-01 08:00:00')
     t9 = pd.Timestamp('2024-01-01 09:00:00')
     t10 = pd.Timestamp('2024-01-01 10:00:00')
+    t11 = pd.Timestamp('2024-01-01 11:00:00')
 
     def row(ts, o):
-        return pd.Series({'timestamp': ts, 'open': o, 'high': o+2, 'low': o-2, 'close': o+1, 'volume': 10.0})
-
-    append_row_if_absent(tmp_db, row(t8, 100.0))
-    append_row_if_absent(tmp_db, row(t9, 110.0))
-
-    # Read last 2 rows ending before t10
-    df = read_last_n_rows_ending_before(tmp_db, 2, t10)
-    assert list(df['timestamp'].astype(str)) == ['2024-01-01 08:00:00', '2024-01-01 09:00:00']
+        return pd.Series({'timestamp': ts, 'snapshot_time': ts + pd.Timedelta(hours=1), 'open': o, 'high': o+2, 'low': o-2, 'close': o+1, 'volume': 10.0})
+
+    # One connection for the whole test, shared by every helper via con=
+    with connect(tmp_db) as con:
+        ensure_table(tmp_db, con=con)
+        max_ts, tail = read_overlap_bundle(tmp_db, 2, con=con)
+        assert max_ts is None and tail.empty
+
+        append_row_if_absent(tmp_db, row(t8, 100.0), con=con)
+        append_row_if_absent(tmp_db, row(t9, 110.0), con=con)
+
+        # Read last 2 rows ending before t10
+        df = read_last_n_rows_ending_before(tmp_db, 2, t10, con=con)
+        assert list(df['timestamp'].astype(str)) == ['2024-01-01 08:00:00', '2024-01-01 09:00:00']
+
+        # Append t10 and re-append to test idempotency
+        append_row_if_absent(tmp_db, row(t10, 120.0), con=con)
+        append_row_if_absent(tmp_db, row(t10, 120.0), con=con)
+
+        # Bundle: max timestamp plus the rows strictly before it
+        max_ts, tail = read_overlap_bundle(tmp_db, 5, con=con)
+        assert max_ts == t10
+        assert list(tail['timestamp'].astype(str)) == ['2024-01-01 08:00:00', '2024-01-01 09:00:00']
+
+        # A failing transaction leaves no partial rows behind
+        try:
+            with transaction(con):
+                append_row_if_absent(tmp_db, row(t11, 130.0), con=con)
+                raise RuntimeError('boom')
+        except RuntimeError:
+            pass
 
-    # Append t10 and re-append to test idempotency
-    append_row_if_absent(tmp_db, row(t10, 120.0))
-    append_row_if_absent(tmp_db, row(t10, 120.0))
-
-    con = duckdb.connect(str(tmp_db))
-    try:
         cnt = con.execute(f'SELECT COUNT(*) FROM {TABLE_NAME}').fetchone()[0]
         assert cnt == 3
-    finally:
-        con.close()
+
+        # Batch append: existing and repeated timestamps are skipped, not a constraint error
+        batch = pd.DataFrame([row(t10, 120.0), row(t11, 130.0), row(t11, 131.0)])
+        assert append_rows_if_absent(tmp_db, batch, con=con) == 1
+        assert append_rows_if_absent(tmp_db, batch, con=con) == 0
+        open_t11 = con.execute(f'SELECT open FROM {TABLE_NAME} WHERE timestamp = ?', [t11.to_pydatetime()]).fetchone()[0]
+        assert open_t11 == 130.0, open_t11
+
+    # Without con= each helper still opens its own connection
+    assert len(read_last_n_rows_ending_before(tmp_db, 5, t11)) == 3
 
     print('db tests OK')
 
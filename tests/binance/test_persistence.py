@@ -16,7 +16,7 @@ def main() -> None:
     if str(root) not in sys.path:
         sys.path.append(str(root))
 
-    from feed_binance_btcusdt_perp.persistence import PersistConfig, write_raw_snapshot
+    from feed_binance_btcusdt_perp.persistence import PersistConfig, write_raw_snapshot, write_raw_snapshot_parquet
 
     df = pd.DataFrame([
         {"timestamp": pd.Timestamp('2024-01-01 00:00:00'), "open": 100.0, "high": 101.0, "low": 99.0, "close": 100.5, "volume": 123.0}
@@ -27,10 +27,37 @@ def main() -> None:
     out = write_raw_snapshot(cfg, '20240101_000000Z', df)
     assert out.exists()
 
+    # Exact on-disk text, independent of optional dependencies and datetime unit
+    expected = 'timestamp,open,high,low,close,volume\n2024-01-01 00:00:00,100.0,101.0,99.0,100.5,123.0\n'
+    assert out.read_text() == expected, out.read_text()
+    out_ms = write_raw_snapshot(cfg, '20240101_000000Z_ms', df.astype({'timestamp': 'datetime64[ms]'}))
+    assert out_ms.read_text() == expected, out_ms.read_text()
+
     df2 = pd.read_csv(out)
     assert list(df2.columns) == ['timestamp', 'open', 'high', 'low', 'close', 'volume']
     assert len(df2) == 1
 
+    # pyarrow round-trip of the same file (optional dependency)
+    try:
+        import pyarrow.csv as pacsv
+    except ImportError:
+        print('SKIP pyarrow csv read-back: pyarrow not installed')
+    else:
+        tbl = pacsv.read_csv(out)
+        assert tbl.column_names == ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+        assert tbl.num_rows == 1
+
+    # Parquet variant (optional dependency)
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        print('SKIP parquet snapshot: pyarrow not installed')
+    else:
+        out_pq = write_raw_snapshot_parquet(cfg, '20240101_000000Z', df)
+        df3 = pd.read_parquet(out_pq)
+        assert list(df3.columns) == ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+        assert len(df3) == 1
+
     print('persistence tests OK')
 
 
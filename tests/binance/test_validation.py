@@ -51,6 +51,11 @@ def main() -> None:
     res3 = validate_window(api_df, db_ts_bad, t)
     assert not res3.ok
 
+    # Non-hourly API window
+    api_gap = _df_from_hours(['2024-01-01 07:00:00', '2024-01-01 09:00:00', '2024-01-01 10:00:00'])
+    res4 = validate_window(api_gap, db_df, t)
+    assert not res4.ok and 'hourly' in res4.reason
+
     print('validation tests OK')
 
 